@@ -66,7 +66,8 @@ class DashboardListener(QThread):
 
         while self._running:
             try:
-                data, addr = sock.recvfrom(8192)
+                # Relay batches can carry many messages in one datagram
+                data, addr = sock.recvfrom(65535)
                 pkt = json.loads(data.decode())
                 self.data_received.emit(pkt)
             except socket.timeout:
@@ -488,7 +489,10 @@ class Dashboard(QWidget):
     def on_data_received(self, packet):
         msg_type = packet.get("type", "")
 
-        if msg_type == "EMERGENCY":
+        if msg_type == "BATCH":
+            for item in packet.get("items", []):
+                self.on_data_received(item)
+        elif msg_type == "EMERGENCY":
             self.handle_emergency(packet)
         elif msg_type == "TPMS_UPDATE":
             self.update_tpms(packet.get("tpms_data", {}))
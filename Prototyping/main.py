@@ -6,51 +6,61 @@ Uses PyQt6 for UI, Groq for AI responses, Whisper v3 Turbo for audio input, and
 
 import sys
 import os
+import asyncio
 import json
+import math
+import re
 import threading
+import queue
 import time
 import wave
 import struct
 import tempfile
+import importlib.util
+from collections import deque
 from datetime import datetime
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from pathlib import Path
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QTextEdit, QLineEdit, QScrollArea,
-    QFrame, QGridLayout, QSizePolicy, QGraphicsDropShadowEffect
+    QFrame, QGridLayout, QSizePolicy, QGraphicsDropShadowEffect,
+    QListView, QStyledItemDelegate, QStyle, QAbstractItemView
 )
 from PyQt6.QtCore import (
-    Qt, QTimer, QThread, pyqtSignal, QPropertyAnimation,
-    QEasingCurve, QSize, QRect, pyqtProperty
+    Qt, QTimer, QThread, QObject, pyqtSignal, QPropertyAnimation,
+    QEasingCurve, QSize, QRect, QRectF, pyqtProperty,
+    QAbstractListModel, QModelIndex
 )
 from PyQt6.QtGui import (
     QFont, QColor, QPalette, QPainter, QLinearGradient,
     QRadialGradient, QBrush, QPen, QPixmap, QIcon,
-    QFontDatabase, QPainterPath
+    QFontDatabase, QFontMetrics, QPainterPath
 )
 
-try:
-    from groq import Groq
-    GROQ_AVAILABLE = True
-except ImportError:
-    GROQ_AVAILABLE = False
+# Groq, pygame and pyttsx3 are only located here; they are imported on first use
+# so the window can appear before their (slow) module initialisation runs.
+GROQ_AVAILABLE = importlib.util.find_spec("groq") is not None
+if not GROQ_AVAILABLE:
     print("Groq not installed. Run: pip install groq")
 
-try:
-    import pygame
-    PYGAME_AVAILABLE = True
-except ImportError:
-    PYGAME_AVAILABLE = False
+PYGAME_AVAILABLE = importlib.util.find_spec("pygame") is not None
+pygame = None
 
-try:
-    import pyttsx3
-    TTS_AVAILABLE = True
-except ImportError:
-    TTS_AVAILABLE = False
+TTS_AVAILABLE = importlib.util.find_spec("pyttsx3") is not None
+
+TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+
+_ENV_LOADED = False
+
+
+def _load_env():
+    """Loads .env into the environment once, on first need."""
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _ENV_LOADED = True
 
 try:
     import sounddevice as sd
@@ -80,6 +90,21 @@ COLORS = {
     "accent_mic":     "#B44FFF",
 }
 
+# Chat bubbles only set an objectName; their rules are formatted once here and
+# attached to the message container, instead of every bubble parsing its own copy.
+# The rounded backgrounds are painted from cached pixmaps (see BubbleLabel).
+BUBBLE_USER_QSS = f"""
+    QLabel#bubbleUser {{
+        color: {COLORS['text_primary']};
+    }}
+"""
+
+BUBBLE_BOT_QSS = f"""
+    QLabel#bubbleBot {{
+        color: {COLORS['text_primary']};
+    }}
+"""
+
 SYSTEM_PROMPT = """You are RAAM — Road Assistance & Alert Monitor. You are an AI co-pilot designed to assist drivers during emergencies, stressful situations, or when they need guidance on the road.
 
 Your personality:
@@ -99,10 +124,126 @@ Your capabilities:
 
 Always start with the most critical safety information. Keep responses short when urgency is high. Use gentle, supportive language. Never panic — your calm is contagious."""
 
+# Built once and prepended to every request; conversation_history holds only turns
+SYSTEM_MSG = ({"role": "system", "content": SYSTEM_PROMPT},)
+
+# Only the most recent exchanges are sent with each request to bound prompt size
+MAX_TURNS = 8
+HISTORY_TOKEN_BUDGET = 4000
+
+# Streamed replies are handed to TTS a sentence at a time
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+# ─── TTS STREAMING ─────────────────────────────────────────────────────────────
+TTS_SAMPLE_RATE = 24000     # Requested from Orpheus as 16-bit mono WAV
+STREAM_CHUNK_SIZE = 4096    # bytes pulled from the HTTP response per read
+STREAM_BUFFER_MS = 150      # audio buffered before playback starts
+
+# ─── EMOJI PIXMAP CACHE ────────────────────────────────────────────────────────
+# Colour emoji are among the most expensive glyphs for Qt to shape, so the icons
+# used on static widgets are rendered once into pixmaps and blitted afterwards.
+EMOJI_SIZE = 24
+EMOJI_ICONS = ("🚑", "🚒", "🚔", "🛣️", "💊", "🆘", "🎙", "🔊", "🔇", "⏹", "⚠", "🗑")
+EMOJI_CACHE: dict[str, QPixmap] = {}
+BUTTON_CACHE: dict[tuple[str, str, str], QPixmap] = {}
+
+
+def emoji_pixmap(emoji: str) -> QPixmap:
+    """Returns a cached pixmap of the emoji, rendering it on first use."""
+    pixmap = EMOJI_CACHE.get(emoji)
+    if pixmap is None:
+        pixmap = QPixmap(EMOJI_SIZE, EMOJI_SIZE)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        font = QFont("Segoe UI Emoji")
+        font.setPixelSize(EMOJI_SIZE - 6)
+        painter = QPainter(pixmap)
+        painter.setFont(font)
+        painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, emoji)
+        painter.end()
+        EMOJI_CACHE[emoji] = pixmap
+    return pixmap
+
+
+def button_pixmap(icon: str, label: str, color: str, height: int) -> QPixmap:
+    """Returns a cached icon + label composite so list rows blit instead of shaping text."""
+    key = (icon, label, color)
+    pixmap = BUTTON_CACHE.get(key)
+    if pixmap is None:
+        font = QFont("Segoe UI", 9)
+        icon_size = height - 16
+        text_x = 8 + icon_size + 8
+        width = text_x + QFontMetrics(font).horizontalAdvance(label) + 8
+        pixmap = QPixmap(width, height)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        painter.drawPixmap(QRect(8, (height - icon_size) // 2, icon_size, icon_size), emoji_pixmap(icon))
+        painter.setFont(font)
+        painter.setPen(QColor(color))
+        painter.drawText(QRect(text_x, 0, width - text_x, height),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, label)
+        painter.end()
+        BUTTON_CACHE[key] = pixmap
+    return pixmap
+
+
+def preload_emoji_cache():
+    """Renders all known icon emoji up front (requires a QApplication)."""
+    for emoji in EMOJI_ICONS:
+        emoji_pixmap(emoji)
+
+
+# ─── TOKEN COUNTING ────────────────────────────────────────────────────────────
+# tiktoken may download its encoding on first load, so ClientInitThread loads it
+# off the UI thread; until then counts use a ~4 characters per token estimate.
+_TOKEN_ENCODER = None
+
+
+def _load_token_encoder():
+    global _TOKEN_ENCODER
+    if TIKTOKEN_AVAILABLE and _TOKEN_ENCODER is None:
+        try:
+            import tiktoken
+            _TOKEN_ENCODER = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            print(f"tiktoken unavailable: {e}")
+
+
+def count_tokens(text: str) -> int:
+    if _TOKEN_ENCODER is not None:
+        return len(_TOKEN_ENCODER.encode(text))
+    return len(text) // 4 + 1
+
+
+# ─── CLIENT INIT THREAD ────────────────────────────────────────────────────────
+class ClientInitThread(QThread):
+    """Builds the Groq clients off the UI thread; read .client/.async_client once finished."""
+
+    def __init__(self, api_key):
+        super().__init__()
+        self.api_key = api_key
+        self.client = None
+        self.async_client = None
+
+    def run(self):
+        try:
+            from groq import Groq, AsyncGroq
+            self.client = Groq(api_key=self.api_key)
+            self.async_client = AsyncGroq(api_key=self.api_key)
+        except Exception as e:
+            print(f"Groq init error: {e}")
+        _load_token_encoder()
+
 
 # ─── AUDIO RECORDING THREAD ────────────────────────────────────────────────────
 class AudioRecorderThread(QThread):
-    """Records audio from microphone until stop() is called."""
+    """Records audio from microphone until stop() is called.
+
+    The sounddevice callback only hands PCM blocks to a queue; a writer thread
+    encodes them into the WAV file while recording is still in progress, so the
+    file is ready as soon as the stream stops.
+    """
     finished = pyqtSignal(str)   # emits path to saved WAV file
     error_occurred = pyqtSignal(str)
 
@@ -113,7 +254,8 @@ class AudioRecorderThread(QThread):
     def __init__(self):
         super().__init__()
         self._recording = False
-        self._frames = []
+        self._chunks = queue.SimpleQueue()
+        self._write_error = None
 
     def run(self):
         if not AUDIO_AVAILABLE:
@@ -121,7 +263,23 @@ class AudioRecorderThread(QThread):
             return
 
         self._recording = True
-        self._frames = []
+        self._write_error = None
+
+        try:
+            tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+            tmp_path = tmp.name
+            tmp.close()
+
+            wf = wave.open(tmp_path, "wb")
+            wf.setnchannels(self.CHANNELS)
+            wf.setsampwidth(2)  # int16 = 2 bytes
+            wf.setframerate(self.SAMPLE_RATE)
+        except Exception as e:
+            self.error_occurred.emit(f"Save error: {e}")
+            return
+
+        writer = threading.Thread(target=self._write_frames, args=(wf,), daemon=True)
+        writer.start()
 
         try:
             with sd.InputStream(
@@ -134,30 +292,43 @@ class AudioRecorderThread(QThread):
                 while self._recording:
                     time.sleep(0.05)
         except Exception as e:
+            self._chunks.put(None)
+            writer.join()
+            self._discard(tmp_path)
             self.error_occurred.emit(f"Recording error: {e}")
             return
 
-        # Save to WAV
-        try:
-            tmp = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-            tmp_path = tmp.name
-            tmp.close()
+        # Let the writer drain whatever is still queued and finalize the header
+        self._chunks.put(None)
+        writer.join()
 
-            with wave.open(tmp_path, "wb") as wf:
-                wf.setnchannels(self.CHANNELS)
-                wf.setsampwidth(2)  # int16 = 2 bytes
-                wf.setframerate(self.SAMPLE_RATE)
-                import numpy as np
-                data = np.concatenate(self._frames, axis=0)
-                wf.writeframes(data.tobytes())
+        if self._write_error is not None:
+            self._discard(tmp_path)
+            self.error_occurred.emit(f"Save error: {self._write_error}")
+            return
 
-            self.finished.emit(tmp_path)
+        self.finished.emit(tmp_path)
+
+    def _write_frames(self, wf):
+        try:
+            with wf:
+                while True:
+                    chunk = self._chunks.get()
+                    if chunk is None:
+                        break
+                    wf.writeframes(chunk)
         except Exception as e:
-            self.error_occurred.emit(f"Save error: {e}")
+            self._write_error = e
 
     def _callback(self, indata, frames, time_info, status):
-        import numpy as np
-        self._frames.append(indata.copy())
+        self._chunks.put(indata.tobytes())
+
+    @staticmethod
+    def _discard(path):
+        try:
+            os.remove(path)
+        except Exception:
+            pass
 
     def stop(self):
         self._recording = False
@@ -198,109 +369,353 @@ class WhisperThread(QThread):
             self.error_occurred.emit(f"Transcription error: {e}")
 
 
-# ─── GROQ AI THREAD ────────────────────────────────────────────────────────────
-class GroqThread(QThread):
-    response_ready = pyqtSignal(str)
-    error_occurred = pyqtSignal(str)
-    chunk_ready = pyqtSignal(str)
+# ─── GROQ AI STREAM ────────────────────────────────────────────────────────────
+class GroqStreamer(QObject):
+    """Streams chat completions with AsyncGroq on one long-lived asyncio loop thread.
 
-    def __init__(self, client, messages):
-        super().__init__()
-        self.client = client
-        self.messages = messages
+    Every signal carries the generation of the start() that produced it; slots
+    drop anything that doesn't match ``generation``, since emissions already
+    queued to the GUI thread survive cancel().
+    """
+    response_ready = pyqtSignal(int, str)
+    error_occurred = pyqtSignal(int, str)
+    chunk_ready = pyqtSignal(int, str)
 
-    def run(self):
+    # Token deltas are coalesced before crossing into the GUI thread
+    FLUSH_CHARS = 64
+    FLUSH_INTERVAL = 0.08
+    FLUSH_ENDINGS = (".", "!", "?", "\n")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._loop = asyncio.new_event_loop()
+        self._future = None
+        self.generation = 0
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+
+    def start(self, client, messages):
+        """Begins streaming a reply, cancelling any reply still in flight."""
+        self.cancel()
+        self._future = asyncio.run_coroutine_threadsafe(
+            self._stream(client, messages, self.generation), self._loop)
+
+    def is_active(self):
+        return self._future is not None and not self._future.done()
+
+    def cancel(self):
+        # Bumped even when idle so late emissions from the last reply go stale
+        self.generation += 1
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+
+    async def _stream(self, client, messages, gen):
         try:
-            stream = self.client.chat.completions.create(
+            stream = await client.chat.completions.create(
                 model="llama-3.3-70b-versatile",
-                messages=self.messages,
+                messages=messages,
                 temperature=0.7,
                 max_tokens=500,
                 stream=True,
             )
             full_response = ""
-            for chunk in stream:
+            pending = ""
+            last_flush = time.monotonic()
+            async for chunk in stream:
                 delta = chunk.choices[0].delta.content or ""
+                if not delta:
+                    continue
                 full_response += delta
-                self.chunk_ready.emit(delta)
-            self.response_ready.emit(full_response)
+                pending += delta
+                now = time.monotonic()
+                if (len(pending) >= self.FLUSH_CHARS
+                        or now - last_flush > self.FLUSH_INTERVAL
+                        or delta.endswith(self.FLUSH_ENDINGS)):
+                    self.chunk_ready.emit(gen, pending)
+                    pending = ""
+                    last_flush = now
+            if pending:
+                self.chunk_ready.emit(gen, pending)
+            self.response_ready.emit(gen, full_response)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            self.error_occurred.emit(str(e))
+            self.error_occurred.emit(gen, str(e))
+
+
+# ─── PYGAME MIXER ──────────────────────────────────────────────────────────────
+_mixer_lock = threading.Lock()
+
+
+def _ensure_mixer():
+    """Imports pygame and opens its audio device once; later utterances reuse it."""
+    global pygame
+    with _mixer_lock:
+        if pygame is None:
+            import pygame as _pygame
+            pygame = _pygame
+        if not pygame.mixer.get_init():
+            # Matches the raw PCM Groq returns, so samples play without conversion
+            pygame.mixer.pre_init(frequency=TTS_SAMPLE_RATE, size=-16, channels=1, buffer=512)
+            pygame.mixer.init()
+
+
+# ─── PYTTSX3 FALLBACK ENGINE ───────────────────────────────────────────────────
+_PYTTSX3_ENGINE = None
+_PYTTSX3_LOCK = threading.Lock()   # pyttsx3 is not reentrant; hold while speaking
+
+
+def _pick_engine():
+    """Returns the shared pyttsx3 engine, enumerating voices only on first use."""
+    global _PYTTSX3_ENGINE
+    if _PYTTSX3_ENGINE is None:
+        import pyttsx3
+        engine = pyttsx3.init()
+        voices = engine.getProperty('voices')
+        for voice in voices:
+            if 'female' in voice.name.lower() or 'zira' in voice.name.lower() or 'hazel' in voice.name.lower():
+                engine.setProperty('voice', voice.id)
+                break
+        engine.setProperty('rate', 165)
+        engine.setProperty('volume', 0.9)
+        _PYTTSX3_ENGINE = engine
+    return _PYTTSX3_ENGINE
+
+
+def _wav_data_offset(buf: bytes):
+    """Byte offset of the PCM samples in a RIFF/WAVE prefix, or None if not reached yet."""
+    pos = 12
+    while pos + 8 <= len(buf):
+        chunk_id = buf[pos:pos + 4]
+        if chunk_id == b"data":
+            return pos + 8
+        size = struct.unpack_from("<I", buf, pos + 4)[0]
+        pos += 8 + size + (size & 1)
+    return None
+
+
+# ─── STREAMING AUDIO PLAYER ────────────────────────────────────────────────────
+class AudioStreamPlayer:
+    """Plays raw int16 mono PCM through sounddevice while it is still arriving."""
+
+    def __init__(self, sample_rate=TTS_SAMPLE_RATE):
+        self._queue = queue.Queue()
+        self._pending = b""
+        self._eof = False
+        self._done = threading.Event()
+        self._stream = sd.RawOutputStream(
+            samplerate=sample_rate,
+            channels=1,
+            dtype="int16",
+            callback=self._audio_callback,
+            finished_callback=self._done.set,
+        )
+
+    def feed(self, data: bytes):
+        self._queue.put(data)
+
+    def start(self):
+        self._stream.start()
+
+    def finish(self):
+        """Marks the end of input; the stream stops once the queue is drained."""
+        self._queue.put(None)
+
+    def wait(self):
+        self._done.wait()
+
+    def abort(self):
+        try:
+            self._stream.abort()
+        except Exception:
+            pass
+        self._done.set()
 
+    def close(self):
+        try:
+            self._stream.close()
+        except Exception:
+            pass
+
+    def _audio_callback(self, outdata, frames, time_info, status):
+        needed = len(outdata)
+        buf = self._pending
+        while len(buf) < needed and not self._eof:
+            try:
+                chunk = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if chunk is None:
+                self._eof = True
+            else:
+                buf += chunk
+        n = min(needed, len(buf))
+        outdata[:n] = buf[:n]
+        if n < needed:
+            outdata[n:] = b"\x00" * (needed - n)
+        self._pending = buf[n:]
+        if self._eof and not self._pending:
+            raise sd.CallbackStop
 
-# ─── TTS THREAD ────────────────────────────────────────────────────────────────
-class TTSThread(QThread):
-    finished = pyqtSignal()
 
-    def __init__(self, text, client=None):
-        super().__init__()
-        self.text = text
+# ─── TTS WORKER ────────────────────────────────────────────────────────────────
+class TTSWorker(QThread):
+    """Speaks queued utterances in order on one long-lived thread.
+
+    The Groq client is reused for every request. cancel() drops whatever is
+    queued and stops the utterance in progress so a newer reply can take over.
+    """
+
+    def __init__(self, client=None, parent=None):
+        super().__init__(parent)
         self.client = client
+        self._queue: queue.Queue = queue.Queue()
+        # Bumped by cancel(); utterances from an older generation are skipped
+        self._generation = 0
+        self._current = 0
+        self._engine = None
+        self._player: AudioStreamPlayer | None = None
+
+    def enqueue(self, text):
+        self._queue.put((self._generation, text))
+
+    def cancel(self):
+        self._generation += 1
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            if self._player is not None:
+                self._player.abort()
+            if pygame is not None and pygame.mixer.get_init():
+                pygame.mixer.stop()
+            if self._engine is not None:
+                self._engine.stop()
+        except Exception as e:
+            print(f"TTS cancel error: {e}")
+
+    def shutdown(self):
+        self.cancel()
+        self._queue.put(None)
+
+    def _cancelled(self):
+        return self._current != self._generation
 
     def run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            self._current, text = item
+            if not self._cancelled():
+                self._speak(text)
+
+    def _speak(self, text):
         try:
             # Try Groq TTS with Autumn voice first
             if self.client:
                 try:
-                    response = self.client.audio.speech.create(
-                        model="canopylabs/orpheus-v1-english",
-                        voice="autumn",
-                        input=self.text[:500],
-                        response_format="wav",
-                    )
-                    import tempfile, os as _os
-                    audio_path = _os.path.join(tempfile.gettempdir(), "raam_tts.wav")
-                    with open(audio_path, "wb") as f:
-                        f.write(response.read())
-
-                    if PYGAME_AVAILABLE:
-                        pygame.mixer.quit()
-                        pygame.mixer.init(frequency=22050, size=-16, channels=1, buffer=512)
-                        sound = pygame.mixer.Sound(audio_path)
-                        sound.play()
-                        while pygame.mixer.get_busy():
-                            time.sleep(0.05)
-                        pygame.mixer.quit()
-                    self.finished.emit()
+                    if AUDIO_AVAILABLE:
+                        self._stream_pcm(text)
+                    else:
+                        self._play_pcm(text)
                     return
                 except Exception as e:
                     print(f"Groq TTS error: {e}")
 
             # Fallback to pyttsx3
-            if TTS_AVAILABLE:
-                engine = pyttsx3.init()
-                voices = engine.getProperty('voices')
-                for voice in voices:
-                    if 'female' in voice.name.lower() or 'zira' in voice.name.lower() or 'hazel' in voice.name.lower():
-                        engine.setProperty('voice', voice.id)
-                        break
-                engine.setProperty('rate', 165)
-                engine.setProperty('volume', 0.9)
-                engine.say(self.text)
-                engine.runAndWait()
+            if TTS_AVAILABLE and not self._cancelled():
+                with _PYTTSX3_LOCK:
+                    engine = _pick_engine()
+                    self._engine = engine
+                    engine.say(text)
+                    engine.runAndWait()
         except Exception as e:
             print(f"TTS error: {e}")
-        self.finished.emit()
+
+    def _stream_pcm(self, text):
+        """Starts playback after ~STREAM_BUFFER_MS of audio instead of the whole file."""
+        player = AudioStreamPlayer()
+        self._player = player
+        prebuffer = TTS_SAMPLE_RATE * 2 * STREAM_BUFFER_MS // 1000
+        buffered = 0
+        started = False
+        header = b""    # WAV header bytes seen so far, until the data chunk starts
+        try:
+            with self.client.audio.speech.with_streaming_response.create(
+                model="canopylabs/orpheus-v1-english",
+                voice="autumn",
+                input=text[:500],
+                response_format="wav",
+                sample_rate=TTS_SAMPLE_RATE,
+            ) as response:
+                for chunk in response.iter_bytes(chunk_size=STREAM_CHUNK_SIZE):
+                    if self._cancelled():
+                        return
+                    if header is not None:
+                        header += chunk
+                        offset = _wav_data_offset(header)
+                        if offset is None:
+                            continue
+                        chunk, header = header[offset:], None
+                    player.feed(chunk)
+                    buffered += len(chunk)
+                    if not started and buffered >= prebuffer:
+                        player.start()
+                        started = True
+            player.finish()
+            if not started:
+                player.start()
+            player.wait()
+        finally:
+            self._player = None
+            player.close()
+
+    def _play_pcm(self, text):
+        response = self.client.audio.speech.create(
+            model="canopylabs/orpheus-v1-english",
+            voice="autumn",
+            input=text[:500],
+            response_format="wav",
+            sample_rate=TTS_SAMPLE_RATE,
+        )
+        wav_bytes = response.read()
+        offset = _wav_data_offset(wav_bytes)
+        if offset is None:
+            raise ValueError("TTS response has no WAV data chunk")
+        pcm_bytes = wav_bytes[offset:]
+        if PYGAME_AVAILABLE and not self._cancelled():
+            _ensure_mixer()
+            channel = pygame.mixer.Channel(0)
+            channel.play(pygame.mixer.Sound(buffer=pcm_bytes))
+            while channel.get_busy() and not self._cancelled():
+                time.sleep(0.05)
 
 
 # ─── PULSE ANIMATION WIDGET ────────────────────────────────────────────────────
 class PulseWidget(QWidget):
+    # One full pulse cycle, precomputed as 0..1 intensities
+    _LUT_SIZE = 128
+    _LUT = [(math.sin(2 * math.pi * i / 128) + 1) / 2 for i in range(128)]
+
     def __init__(self, color="#F5A623", parent=None):
         super().__init__(parent)
-        self.color = QColor(color)
+        self.set_color(color)
         self._opacity = 0.0
         self._radius = 0.0
         self.setFixedSize(60, 60)
         self._anim_timer = QTimer(self)
         self._anim_timer.timeout.connect(self._tick)
-        self._phase = 0.0
+        self._idx = 0
         self._anim_timer.start(30)
 
     def _tick(self):
-        self._phase = (self._phase + 0.05) % (2 * 3.14159)
-        import math
-        self._opacity = (math.sin(self._phase) + 1) / 2
-        self._radius = 15 + 10 * (math.sin(self._phase) + 1) / 2
+        self._idx = (self._idx + 1) % self._LUT_SIZE
+        v = self._LUT[self._idx]
+        self._opacity = v
+        self._radius = 15 + 10 * v
         self.update()
 
     def paintEvent(self, event):
@@ -309,21 +724,25 @@ class PulseWidget(QWidget):
         cx, cy = self.width() // 2, self.height() // 2
 
         # Outer pulse
-        glow = QColor(self.color)
-        glow.setAlphaF(self._opacity * 0.3)
+        self._glow_color.setAlphaF(self._opacity * 0.3)
+        self._glow_brush.setColor(self._glow_color)
         p.setPen(Qt.PenStyle.NoPen)
-        p.setBrush(QBrush(glow))
+        p.setBrush(self._glow_brush)
         r = int(self._radius)
         p.drawEllipse(cx - r, cy - r, r * 2, r * 2)
 
         # Inner dot
-        core = QColor(self.color)
-        core.setAlphaF(0.9)
-        p.setBrush(QBrush(core))
+        p.setBrush(self._core_brush)
         p.drawEllipse(cx - 8, cy - 8, 16, 16)
 
     def set_color(self, hex_color: str):
         self.color = QColor(hex_color)
+        # Paint objects are built once per colour and only their alpha changes per frame
+        self._glow_color = QColor(self.color)
+        self._glow_brush = QBrush(self._glow_color)
+        self._core_color = QColor(self.color)
+        self._core_color.setAlphaF(0.9)
+        self._core_brush = QBrush(self._core_color)
 
 
 # ─── MIC BUTTON ────────────────────────────────────────────────────────────────
@@ -334,6 +753,7 @@ class MicButton(QPushButton):
         self.setFixedSize(46, 46)
         self.setCursor(Qt.CursorShape.PointingHandCursor)
         self.setCheckable(True)
+        self.setIconSize(QSize(EMOJI_SIZE, EMOJI_SIZE))
         self._pulse_timer = QTimer(self)
         self._pulse_timer.timeout.connect(self._pulse_tick)
         self._pulse_phase = 0.0
@@ -342,7 +762,7 @@ class MicButton(QPushButton):
 
     def _update_style(self, recording: bool):
         if recording:
-            self.setText("⏹")
+            self.setIcon(QIcon(emoji_pixmap("⏹")))
             self.setStyleSheet(f"""
                 QPushButton {{
                     background: {COLORS['accent_red']};
@@ -356,7 +776,7 @@ class MicButton(QPushButton):
                 }}
             """)
         else:
-            self.setText("🎙")
+            self.setIcon(QIcon(emoji_pixmap("🎙")))
             self.setStyleSheet(f"""
                 QPushButton {{
                     background: rgba(180,79,255,0.15);
@@ -385,7 +805,6 @@ class MicButton(QPushButton):
 
     def _pulse_tick(self):
         self._pulse_phase += 0.12
-        import math
         alpha = int(80 + 60 * abs(math.sin(self._pulse_phase)))
         self.setStyleSheet(f"""
             QPushButton {{
@@ -417,6 +836,7 @@ class StatusBar(QWidget):
         self.time_label = QLabel()
         self.time_label.setFont(QFont("Segoe UI", 10))
         self.time_label.setStyleSheet(f"color: {COLORS['text_secondary']};")
+        self._last_minute = None
 
         timer = QTimer(self)
         timer.timeout.connect(self._update_time)
@@ -448,7 +868,12 @@ class StatusBar(QWidget):
         """)
 
     def _update_time(self):
-        self.time_label.setText(datetime.now().strftime("%H:%M  %d %b %Y"))
+        # The clock only shows minutes, so skip the repaint until one rolls over
+        now = datetime.now()
+        key = (now.hour, now.minute)
+        if key != self._last_minute:
+            self._last_minute = key
+            self.time_label.setText(now.strftime("%H:%M  %d %b %Y"))
 
     def set_status(self, text, color):
         self.status_label.setText(f"● {text}")
@@ -456,35 +881,101 @@ class StatusBar(QWidget):
 
 
 # ─── CHAT BUBBLE ───────────────────────────────────────────────────────────────
+# Each bubble style is rasterised once as a small 9-slice pixmap: the corners are
+# copied as-is and the edges/centre stretched to the label's size when painting.
+BUBBLE_RADIUS = 16
+BUBBLE_CACHE: dict[bool, QPixmap] = {}
+
+
+def _rounded_path(rect: QRectF, tl, tr, br, bl) -> QPainterPath:
+    path = QPainterPath()
+    path.moveTo(rect.left() + tl, rect.top())
+    path.lineTo(rect.right() - tr, rect.top())
+    path.arcTo(QRectF(rect.right() - 2 * tr, rect.top(), 2 * tr, 2 * tr), 90, -90)
+    path.lineTo(rect.right(), rect.bottom() - br)
+    path.arcTo(QRectF(rect.right() - 2 * br, rect.bottom() - 2 * br, 2 * br, 2 * br), 0, -90)
+    path.lineTo(rect.left() + bl, rect.bottom())
+    path.arcTo(QRectF(rect.left(), rect.bottom() - 2 * bl, 2 * bl, 2 * bl), 270, -90)
+    path.lineTo(rect.left(), rect.top() + tl)
+    path.arcTo(QRectF(rect.left(), rect.top(), 2 * tl, 2 * tl), 180, -90)
+    path.closeSubpath()
+    return path
+
+
+def bubble_pixmap(is_user: bool) -> QPixmap:
+    """Returns the cached 9-slice background for a user or assistant bubble."""
+    pixmap = BUBBLE_CACHE.get(is_user)
+    if pixmap is None:
+        r = BUBBLE_RADIUS
+        size = 2 * r + 1
+        pixmap = QPixmap(size, size)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        if is_user:
+            fill, border, corners = QColor(74, 158, 255, 38), QColor(74, 158, 255, 77), (r, 4, r, r)
+        else:
+            fill, border, corners = QColor(0, 212, 170, 20), QColor(0, 212, 170, 51), (4, r, r, r)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QPen(border, 1))
+        painter.setBrush(fill)
+        painter.drawPath(_rounded_path(QRectF(0.5, 0.5, size - 1, size - 1), *corners))
+        painter.end()
+        BUBBLE_CACHE[is_user] = pixmap
+    return pixmap
+
+
+class BubbleLabel(QLabel):
+    """Message text over a cached rounded background instead of a QSS border-radius."""
+
+    def __init__(self, text, is_user, parent=None):
+        super().__init__(text, parent)
+        self._background = bubble_pixmap(is_user)
+
+    def paintEvent(self, event):
+        pm, m = self._background, BUBBLE_RADIUS
+        r = self.rect()
+        src_x = (0, m, pm.width() - m, pm.width())
+        src_y = (0, m, pm.height() - m, pm.height())
+        dst_x = (r.left(), r.left() + m, r.right() + 1 - m, r.right() + 1)
+        dst_y = (r.top(), r.top() + m, r.bottom() + 1 - m, r.bottom() + 1)
+        painter = QPainter(self)
+        for i in range(3):
+            for j in range(3):
+                painter.drawPixmap(
+                    QRect(dst_x[i], dst_y[j], dst_x[i + 1] - dst_x[i], dst_y[j + 1] - dst_y[j]),
+                    pm,
+                    QRect(src_x[i], src_y[j], src_x[i + 1] - src_x[i], src_y[j + 1] - src_y[j]),
+                )
+        painter.end()
+        super().paintEvent(event)
+
+
 class ChatBubble(QWidget):
+    # Shared by every bubble; styling comes from BUBBLE_*_QSS on the messages widget
+    _FONT: QFont | None = None
+
     def __init__(self, text, is_user=False, parent=None):
         super().__init__(parent)
+        if ChatBubble._FONT is None:
+            # Built on first use, once a QApplication exists
+            ChatBubble._FONT = QFont("Segoe UI", 11)
         layout = QHBoxLayout(self)
         layout.setContentsMargins(8, 4, 8, 4)
 
         if is_user:
             layout.addStretch()
 
-        bubble = QLabel(text)
+        bubble = BubbleLabel(text, is_user)
+        # Model output is plain text: skip rich-text sniffing on every setText
+        bubble.setTextFormat(Qt.TextFormat.PlainText)
+        bubble.setTextInteractionFlags(Qt.TextInteractionFlag.NoTextInteraction)
         bubble.setWordWrap(True)
-        bubble.setFont(QFont("Segoe UI", 11))
+        bubble.setFont(ChatBubble._FONT)
         bubble.setMaximumWidth(480)
         bubble.setContentsMargins(14, 10, 14, 10)
-
-        if is_user:
-            bubble.setStyleSheet(f"""
-                background: rgba(74,158,255,0.15);
-                border: 1px solid rgba(74,158,255,0.3);
-                border-radius: 16px 4px 16px 16px;
-                color: {COLORS['text_primary']};
-            """)
-        else:
-            bubble.setStyleSheet(f"""
-                background: rgba(0,212,170,0.08);
-                border: 1px solid rgba(0,212,170,0.2);
-                border-radius: 4px 16px 16px 16px;
-                color: {COLORS['text_primary']};
-            """)
+        bubble.setMinimumHeight(2 * BUBBLE_RADIUS)
+        bubble.setObjectName("bubbleUser" if is_user else "bubbleBot")
+        self.text_label = bubble
 
         layout.addWidget(bubble)
 
@@ -492,6 +983,111 @@ class ChatBubble(QWidget):
             layout.addStretch()
 
 
+# ─── ICON LISTS (SCENARIOS / CONTACTS) ─────────────────────────────────────────
+class IconListModel(QAbstractListModel):
+    """Read-only rows of (icon, label, detail) for the sidebar and contact lists."""
+    IconRole = Qt.ItemDataRole.UserRole + 1
+    DetailRole = Qt.ItemDataRole.UserRole + 2
+
+    def __init__(self, rows, parent=None):
+        super().__init__(parent)
+        self._rows = rows
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        icon, label, detail = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return label
+        if role == self.IconRole:
+            return icon
+        if role == self.DetailRole:
+            return detail
+        return None
+
+
+class ScenarioDelegate(QStyledItemDelegate):
+    """Paints a quick-scenario row as a rounded card with a cached icon + label pixmap."""
+    ROW_HEIGHT = 34
+    GAP = 12
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pen = QPen(QColor(COLORS['border']))
+        self._brush = QBrush(QColor(255, 255, 255, 8))
+        self._hover_pen = QPen(QColor(245, 166, 35, 77))
+        self._hover_brush = QBrush(QColor(245, 166, 35, 20))
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT + self.GAP)
+
+    def paint(self, painter, option, index):
+        hover = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        r = option.rect
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(self._hover_pen if hover else self._pen)
+        painter.setBrush(self._hover_brush if hover else self._brush)
+        painter.drawRoundedRect(QRectF(r.x() + 0.5, r.y() + 0.5, r.width() - 1, self.ROW_HEIGHT - 1), 8, 8)
+
+        pixmap = button_pixmap(index.data(IconListModel.IconRole),
+                               index.data(Qt.ItemDataRole.DisplayRole),
+                               COLORS['accent_amber'] if hover else COLORS['text_secondary'],
+                               self.ROW_HEIGHT)
+        painter.setClipRect(r)
+        painter.drawPixmap(r.x(), r.y(), pixmap)
+        painter.restore()
+
+
+class ContactDelegate(QStyledItemDelegate):
+    """Paints an emergency-contact row: icon, name and right-aligned number."""
+    ROW_HEIGHT = 42
+    GAP = 14
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._name_font = QFont("Segoe UI", 9)
+        self._number_font = QFont("Segoe UI", 9, QFont.Weight.Bold)
+        self._name_metrics = QFontMetrics(self._name_font)
+        self._number_metrics = QFontMetrics(self._number_font)
+        self._pen = QPen(QColor(COLORS['border']))
+        self._brush = QBrush(QColor(255, 255, 255, 8))
+        self._name_color = QColor(COLORS['text_secondary'])
+        self._number_color = QColor(COLORS['accent_teal'])
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT + self.GAP)
+
+    def paint(self, painter, option, index):
+        r = option.rect
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(self._pen)
+        painter.setBrush(self._brush)
+        painter.drawRoundedRect(QRectF(r.x() + 0.5, r.y() + 0.5, r.width() - 1, self.ROW_HEIGHT - 1), 8, 8)
+
+        icon_y = r.y() + (self.ROW_HEIGHT - EMOJI_SIZE) // 2
+        painter.drawPixmap(r.x() + 10, icon_y, emoji_pixmap(index.data(IconListModel.IconRole)))
+
+        text_rect = QRect(r.x() + 10 + EMOJI_SIZE + 8, r.y(), r.width() - EMOJI_SIZE - 28, self.ROW_HEIGHT)
+        number = index.data(IconListModel.DetailRole)
+        # The number always fits; the name gets what is left and is elided
+        name_width = max(0, text_rect.width() - self._number_metrics.horizontalAdvance(number) - 8)
+        name = self._name_metrics.elidedText(index.data(Qt.ItemDataRole.DisplayRole),
+                                             Qt.TextElideMode.ElideRight, name_width)
+        painter.setFont(self._name_font)
+        painter.setPen(self._name_color)
+        painter.drawText(QRect(text_rect.x(), text_rect.y(), name_width, text_rect.height()),
+                         Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, name)
+        painter.setFont(self._number_font)
+        painter.setPen(self._number_color)
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, number)
+        painter.restore()
+
+
 # ─── MAIN WINDOW ───────────────────────────────────────────────────────────────
 class RAAMDashboard(QMainWindow):
     def __init__(self):
@@ -501,27 +1097,97 @@ class RAAMDashboard(QMainWindow):
         self.resize(1200, 800)
 
         # Load API key
+        _load_env()
         self.api_key = os.getenv("GROQ_API_KEY", "")
         self.client = None
-        self.conversation_history = [{"role": "system", "content": SYSTEM_PROMPT}]
+        self.async_client = None
+        # Recent turns only, bounded by MAX_TURNS and HISTORY_TOKEN_BUDGET;
+        # _history_tokens holds the count for each entry so trimming never re-encodes
+        self.conversation_history: deque[dict] = deque()
+        self._history_tokens: deque[int] = deque()
+        self._history_total = 0
         self.tts_enabled = True
-        self.is_speaking = False
+        self._sentence_buf = ""
+
+        # One speech thread for the whole session; the client is attached once ready
+        self._tts_worker = TTSWorker(parent=self)
+        self._tts_worker.start()
+
+        # Streaming reply state; one repeating timer applies buffered text per tick
+        self._current_response = ""
+        self._response_bubble: ChatBubble | None = None
+        self._response_label: QLabel | None = None
+        self._last_rendered_len = 0
+        self._reply_pending = False
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setInterval(33)
+        self._flush_timer.timeout.connect(self._flush_pending)
+
+        # Chat replies stream on a single asyncio loop; one in flight at a time
+        self._groq = GroqStreamer(self)
+        self._groq.chunk_ready.connect(self._on_chunk)
+        self._groq.response_ready.connect(self._on_response_complete)
+        self._groq.error_occurred.connect(self._on_error)
 
         # Recording state
         self._recorder: AudioRecorderThread | None = None
         self._is_recording = False
-
-        if GROQ_AVAILABLE and self.api_key:
-            try:
-                self.client = Groq(api_key=self.api_key)
-            except Exception as e:
-                print(f"Groq init error: {e}")
+        self._client_init: ClientInitThread | None = None
 
         self._setup_ui()
         self._apply_global_style()
 
-        # Welcome message
-        QTimer.singleShot(800, self._send_welcome)
+        if GROQ_AVAILABLE and self.api_key:
+            # Input waits for the client so the first message isn't answered offline
+            self.send_btn.setEnabled(False)
+            self.input_field.setEnabled(False)
+            self._client_init = ClientInitThread(self.api_key)
+            self._client_init.finished.connect(self._on_client_ready)
+            self._client_init.start()
+        else:
+            # Welcome message
+            QTimer.singleShot(800, self._send_welcome)
+        self._update_client_status()
+
+    def _on_client_ready(self):
+        self.client = self._client_init.client
+        self.async_client = self._client_init.async_client
+        self._tts_worker.client = self.client
+        self._client_init = None
+        self._update_client_status()
+        self.send_btn.setEnabled(True)
+        self.input_field.setEnabled(True)
+        self._send_welcome()
+
+    def _update_client_status(self):
+        """Reflects Groq availability in the header badges and the mic button."""
+        whisper_available = AUDIO_AVAILABLE and bool(self.client)
+        self.whisper_badge.setStyleSheet(f"""
+            color: {COLORS['accent_mic'] if whisper_available else COLORS['text_muted']};
+            background: {'rgba(180,79,255,0.1)' if whisper_available else 'rgba(255,255,255,0.03)'};
+            border: 1px solid {'rgba(180,79,255,0.3)' if whisper_available else COLORS['border']};
+            border-radius: 4px;
+            padding: 2px 8px;
+            letter-spacing: 1px;
+        """)
+
+        if self.client and self.api_key:
+            self.api_status.setText("✓ Groq Connected")
+            self.api_status.setStyleSheet(f"color: {COLORS['accent_teal']};")
+        elif self._client_init is not None:
+            self.api_status.setText("… Connecting")
+            self.api_status.setStyleSheet(f"color: {COLORS['text_secondary']};")
+        else:
+            self.api_status.setText("⚠ No API Key")
+            self.api_status.setStyleSheet(f"color: {COLORS['accent_amber']};")
+
+        self.mic_btn.setEnabled(whisper_available)
+        if whisper_available:
+            self.mic_btn.setToolTip("Hold to record voice (Whisper v3 Turbo)")
+        else:
+            self.mic_btn.setToolTip(
+                "Install sounddevice + numpy and provide GROQ_API_KEY to enable voice input"
+            )
 
     def _apply_global_style(self):
         self.setStyleSheet(f"""
@@ -612,14 +1278,20 @@ class RAAMDashboard(QMainWindow):
             ("🛞", "Flat Tire", "I have a flat tire."),
         ]
 
-        for icon, label, message in scenarios:
-            btn = self._scenario_button(icon, label, message)
-            layout.addWidget(btn)
+        # One view paints every row instead of a styled QPushButton per scenario
+        self.scenario_model = IconListModel(scenarios, self)
+        self.scenario_view = self._icon_list_view(self.scenario_model, ScenarioDelegate(self))
+        self.scenario_view.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
+        self.scenario_view.clicked.connect(
+            lambda index: self._quick_message(index.data(IconListModel.DetailRole))
+        )
+        layout.addWidget(self.scenario_view)
 
         layout.addStretch()
 
         # TTS Toggle
-        self.tts_btn = QPushButton("🔊  Voice Response ON")
+        self.tts_btn = QPushButton("  Voice Response ON")
+        self.tts_btn.setIcon(QIcon(emoji_pixmap("🔊")))
         self.tts_btn.setCheckable(True)
         self.tts_btn.setChecked(True)
         self.tts_btn.setCursor(Qt.CursorShape.PointingHandCursor)
@@ -643,7 +1315,8 @@ class RAAMDashboard(QMainWindow):
         layout.addWidget(self.tts_btn)
 
         # Clear Chat
-        clear_btn = QPushButton("🗑  Clear Chat")
+        clear_btn = QPushButton("  Clear Chat")
+        clear_btn.setIcon(QIcon(emoji_pixmap("🗑")))
         clear_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         clear_btn.setFont(QFont("Segoe UI", 9))
         clear_btn.clicked.connect(self._clear_chat)
@@ -664,28 +1337,21 @@ class RAAMDashboard(QMainWindow):
 
         return sidebar
 
-    def _scenario_button(self, icon, label, message):
-        btn = QPushButton(f"{icon}  {label}")
-        btn.setCursor(Qt.CursorShape.PointingHandCursor)
-        btn.setFont(QFont("Segoe UI", 9))
-        btn.setFixedHeight(34)
-        btn.setStyleSheet(f"""
-            QPushButton {{
-                background: rgba(255,255,255,0.03);
-                border: 1px solid {COLORS['border']};
-                border-radius: 8px;
-                color: {COLORS['text_secondary']};
-                text-align: left;
-                padding-left: 8px;
-            }}
-            QPushButton:hover {{
-                background: rgba(245,166,35,0.08);
-                border: 1px solid rgba(245,166,35,0.3);
-                color: {COLORS['accent_amber']};
-            }}
-        """)
-        btn.clicked.connect(lambda: self._quick_message(message))
-        return btn
+    def _icon_list_view(self, model, delegate):
+        """A non-scrolling list view sized to show every row of the model."""
+        view = QListView()
+        view.setModel(model)
+        view.setItemDelegate(delegate)
+        view.setMouseTracking(True)
+        view.setFrameShape(QFrame.Shape.NoFrame)
+        view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        view.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        view.setUniformItemSizes(True)
+        view.setStyleSheet("* { background: transparent; border: none; }")
+        view.setFixedHeight(model.rowCount() * (delegate.ROW_HEIGHT + delegate.GAP) - delegate.GAP)
+        return view
 
     def _build_chat_area(self):
         container = QWidget()
@@ -716,27 +1382,15 @@ class RAAMDashboard(QMainWindow):
         h_layout.addWidget(self.thinking_label)
         h_layout.addStretch()
 
-        # Whisper badge
-        whisper_badge = QLabel("🎙 Whisper v3 Turbo")
-        whisper_badge.setFont(QFont("Segoe UI", 8, QFont.Weight.Bold))
-        whisper_available = AUDIO_AVAILABLE and bool(self.client)
-        whisper_badge.setStyleSheet(f"""
-            color: {COLORS['accent_mic'] if whisper_available else COLORS['text_muted']};
-            background: {'rgba(180,79,255,0.1)' if whisper_available else 'rgba(255,255,255,0.03)'};
-            border: 1px solid {'rgba(180,79,255,0.3)' if whisper_available else COLORS['border']};
-            border-radius: 4px;
-            padding: 2px 8px;
-            letter-spacing: 1px;
-        """)
-        h_layout.addWidget(whisper_badge)
+        # Whisper badge (styled by _update_client_status)
+        self.whisper_badge = QLabel("🎙 Whisper v3 Turbo")
+        self.whisper_badge.setFont(QFont("Segoe UI", 8, QFont.Weight.Bold))
+        h_layout.addWidget(self.whisper_badge)
         h_layout.addSpacing(10)
 
-        api_status_text = "✓ Groq Connected" if (self.client and self.api_key) else "⚠ No API Key"
-        api_status_color = COLORS['accent_teal'] if (self.client and self.api_key) else COLORS['accent_amber']
-        api_status = QLabel(api_status_text)
-        api_status.setFont(QFont("Segoe UI", 9))
-        api_status.setStyleSheet(f"color: {api_status_color};")
-        h_layout.addWidget(api_status)
+        self.api_status = QLabel()
+        self.api_status.setFont(QFont("Segoe UI", 9))
+        h_layout.addWidget(self.api_status)
 
         layout.addWidget(header)
 
@@ -746,12 +1400,19 @@ class RAAMDashboard(QMainWindow):
         self.scroll_area.setFrameShape(QFrame.Shape.NoFrame)
         self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         self.scroll_area.setStyleSheet(f"background: {COLORS['bg_deep']};")
+        # Follow the conversation whenever the content grows, instead of a timer per update
+        self._follow_bottom = True
+        self._scroll_pending = False
+        self.scroll_area.verticalScrollBar().rangeChanged.connect(self._scroll_to_bottom)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self._on_scroll_value)
 
         self.messages_widget = QWidget()
+        self.messages_widget.setStyleSheet(BUBBLE_USER_QSS + BUBBLE_BOT_QSS)
         self.messages_layout = QVBoxLayout(self.messages_widget)
         self.messages_layout.setContentsMargins(16, 16, 16, 16)
         self.messages_layout.setSpacing(8)
-        self.messages_layout.addStretch()
+        # Top-aligned instead of a trailing stretch so bubbles are simply appended
+        self.messages_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
 
         self.scroll_area.setWidget(self.messages_widget)
         layout.addWidget(self.scroll_area, stretch=1)
@@ -775,13 +1436,7 @@ class RAAMDashboard(QMainWindow):
 
         # Mic button
         self.mic_btn = MicButton()
-        self.mic_btn.setToolTip("Hold to record voice (Whisper v3 Turbo)")
         self.mic_btn.clicked.connect(self._toggle_recording)
-        if not (AUDIO_AVAILABLE and self.client):
-            self.mic_btn.setEnabled(False)
-            self.mic_btn.setToolTip(
-                "Install sounddevice + numpy and provide GROQ_API_KEY to enable voice input"
-            )
         layout.addWidget(self.mic_btn)
 
         self.input_field = QLineEdit()
@@ -860,8 +1515,8 @@ class RAAMDashboard(QMainWindow):
             ("💊", "Poison Control", "1-800-222-1222"),
         ]
 
-        for icon, name, number in contacts:
-            layout.addWidget(self._contact_card(icon, name, number))
+        self.contact_model = IconListModel(contacts, self)
+        layout.addWidget(self._icon_list_view(self.contact_model, ContactDelegate(self)))
 
         layout.addWidget(self._divider())
 
@@ -887,7 +1542,9 @@ class RAAMDashboard(QMainWindow):
 
         layout.addStretch()
 
-        sos_btn = QPushButton("🆘  SOS EMERGENCY")
+        sos_btn = QPushButton("  SOS EMERGENCY")
+        sos_btn.setIcon(QIcon(emoji_pixmap("🆘")))
+        sos_btn.setIconSize(QSize(EMOJI_SIZE, EMOJI_SIZE))
         sos_btn.setFixedHeight(52)
         sos_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         sos_btn.setFont(QFont("Segoe UI", 11, QFont.Weight.Bold))
@@ -911,36 +1568,6 @@ class RAAMDashboard(QMainWindow):
 
         return panel
 
-    def _contact_card(self, icon, name, number):
-        card = QWidget()
-        card.setFixedHeight(42)
-        card.setStyleSheet(f"""
-            background: rgba(255,255,255,0.03);
-            border: 1px solid {COLORS['border']};
-            border-radius: 8px;
-        """)
-        row = QHBoxLayout(card)
-        row.setContentsMargins(10, 0, 10, 0)
-
-        icon_lbl = QLabel(icon)
-        icon_lbl.setFont(QFont("Segoe UI Emoji", 14))
-        icon_lbl.setStyleSheet("background: transparent; border: none;")
-
-        name_lbl = QLabel(name)
-        name_lbl.setFont(QFont("Segoe UI", 9))
-        name_lbl.setStyleSheet(f"color: {COLORS['text_secondary']}; background: transparent; border: none;")
-
-        num_lbl = QLabel(number)
-        num_lbl.setFont(QFont("Segoe UI", 9, QFont.Weight.Bold))
-        num_lbl.setStyleSheet(f"color: {COLORS['accent_teal']}; background: transparent; border: none;")
-
-        row.addWidget(icon_lbl)
-        row.addWidget(name_lbl)
-        row.addStretch()
-        row.addWidget(num_lbl)
-
-        return card
-
     def _divider(self):
         line = QFrame()
         line.setFrameShape(QFrame.Shape.HLine)
@@ -1020,13 +1647,23 @@ class RAAMDashboard(QMainWindow):
     # ─── MESSAGE HANDLING ──────────────────────────────────────────────────────
     def _add_message(self, text, is_user=False):
         bubble = ChatBubble(text, is_user)
-        count = self.messages_layout.count()
-        self.messages_layout.insertWidget(count - 1, bubble)
-        QTimer.singleShot(50, self._scroll_to_bottom)
+        self.messages_layout.addWidget(bubble)
+
+    def _scroll_to_bottom(self, minimum, maximum):
+        # Auto-follow only while the user hasn't scrolled up to read history;
+        # range changes within one frame collapse into a single scroll
+        if self._follow_bottom and not self._scroll_pending:
+            self._scroll_pending = True
+            QTimer.singleShot(33, self._do_scroll)
 
-    def _scroll_to_bottom(self):
-        sb = self.scroll_area.verticalScrollBar()
-        sb.setValue(sb.maximum())
+    def _do_scroll(self):
+        self._scroll_pending = False
+        if self._follow_bottom:
+            sb = self.scroll_area.verticalScrollBar()
+            sb.setValue(sb.maximum())
+
+    def _on_scroll_value(self, value):
+        self._follow_bottom = value >= self.scroll_area.verticalScrollBar().maximum()
 
     def _send_welcome(self):
         welcome = "Hello! I'm RAAM, your Road Assistance & Alert Monitor. I'm here with you, calm and ready to help. Whether it's a breakdown, an accident, or just a stressful drive — tell me what's happening and we'll handle it together. You can type or tap the 🎙 mic button to speak. 🧡"
@@ -1045,93 +1682,167 @@ class RAAMDashboard(QMainWindow):
 
         self.input_field.clear()
         self._add_message(text, is_user=True)
-        self.conversation_history.append({"role": "user", "content": text})
+        self._append_history("user", text)
 
-        self.send_btn.setEnabled(False)
-        self.input_field.setEnabled(False)
-        self.mic_btn.setEnabled(False)
-        self.thinking_label.setText("RAAM is thinking…")
-        self.status_bar.set_status("THINKING", COLORS['accent_amber'])
+        self._set_state(busy=True)
 
         if self.client:
             self._current_response = ""
             self._response_bubble = None
-
-            self.groq_thread = GroqThread(self.client, self.conversation_history.copy())
-            self.groq_thread.chunk_ready.connect(self._on_chunk)
-            self.groq_thread.response_ready.connect(self._on_response_complete)
-            self.groq_thread.error_occurred.connect(self._on_error)
-            self.groq_thread.start()
+            self._response_label = None
+            self._last_rendered_len = 0
+            self._sentence_buf = ""
+            self._stop_speech()
+            self._reply_pending = True
+
+            messages = SYSTEM_MSG + tuple(self.conversation_history)
+            self._groq.start(self.async_client, messages)
         else:
             demo_response = "I hear you, and I want you to know — you're not alone right now. Please make sure you're in a safe location. If this is a life-threatening emergency, please call 911 immediately. I'm here to guide you through this step by step. Can you tell me more about what's happening?"
             self._add_message(demo_response, is_user=False)
             self._finish_response(demo_response)
 
-    def _on_chunk(self, chunk):
+    def _append_history(self, role, content):
+        """Records a turn, dropping the oldest ones beyond the turn or token budget."""
+        tokens = count_tokens(content)
+        self.conversation_history.append({"role": role, "content": content})
+        self._history_tokens.append(tokens)
+        self._history_total += tokens
+        while len(self.conversation_history) > 1 and (
+                len(self.conversation_history) > MAX_TURNS * 2
+                or self._history_total > HISTORY_TOKEN_BUDGET):
+            self.conversation_history.popleft()
+            self._history_total -= self._history_tokens.popleft()
+
+    def _on_chunk(self, gen, chunk):
+        if gen != self._groq.generation:
+            return
         self._current_response += chunk
         if self._response_bubble is None:
             self._response_bubble = ChatBubble(self._current_response, is_user=False)
-            count = self.messages_layout.count()
-            self.messages_layout.insertWidget(count - 1, self._response_bubble)
-        else:
-            label = self._response_bubble.findChild(QLabel)
-            if label:
-                label.setText(self._current_response)
-        QTimer.singleShot(20, self._scroll_to_bottom)
+            self._response_label = self._response_bubble.text_label
+            self._last_rendered_len = len(self._current_response)
+            self.messages_layout.addWidget(self._response_bubble)
+        elif chunk.strip() and not self._flush_timer.isActive():
+            self._flush_timer.start()
 
-    def _on_response_complete(self, full_text):
-        self.conversation_history.append({"role": "assistant", "content": full_text})
-        self._finish_response(full_text)
-
-    def _on_error(self, error):
+        if self.tts_enabled:
+            # Speak each sentence as soon as it is complete
+            self._sentence_buf += chunk
+            parts = SENTENCE_END.split(self._sentence_buf)
+            self._sentence_buf = parts.pop()
+            for sentence in parts:
+                if sentence.strip():
+                    self._enqueue_speech(sentence.strip())
+
+    def _flush_pending(self):
+        if self._response_label is None or len(self._current_response) == self._last_rendered_len:
+            return
+        # Suspend painting so the tick's text change yields one composited repaint
+        label = self._response_label
+        label.setUpdatesEnabled(False)
+        label.setText(self._current_response)
+        label.setUpdatesEnabled(True)
+        label.update()
+        self._last_rendered_len = len(self._current_response)
+
+    def _on_response_complete(self, gen, full_text):
+        if gen != self._groq.generation:
+            return
+        self._flush_pending()
+        self._append_history("assistant", full_text)
+        if self.tts_enabled and self._sentence_buf.strip():
+            self._enqueue_speech(self._sentence_buf.strip())
+        self._sentence_buf = ""
+        self._finish_response(full_text, speak=False)
+
+    def _on_error(self, gen, error):
+        if gen != self._groq.generation:
+            return
         msg = f"I'm having a little trouble connecting right now. Please call 911 if this is an emergency. Error: {error}"
         self._add_message(msg, is_user=False)
         self._finish_response(msg)
 
-    def _finish_response(self, text):
-        self.send_btn.setEnabled(True)
-        self.input_field.setEnabled(True)
-        if AUDIO_AVAILABLE and self.client:
-            self.mic_btn.setEnabled(True)
-        self.thinking_label.setText("")
-        self.status_bar.set_status("ACTIVE", COLORS['accent_teal'])
+    def _set_state(self, busy: bool):
+        """Switches the input area between idle and thinking with a single repaint."""
+        self.setUpdatesEnabled(False)
+        self.send_btn.setEnabled(not busy)
+        self.input_field.setEnabled(not busy)
+        self.mic_btn.setEnabled(not busy and AUDIO_AVAILABLE and bool(self.client))
+        self.thinking_label.setText("RAAM is thinking…" if busy else "")
+        if busy:
+            self.status_bar.set_status("THINKING", COLORS['accent_amber'])
+        else:
+            self.status_bar.set_status("ACTIVE", COLORS['accent_teal'])
+        self.setUpdatesEnabled(True)
+
+    def _finish_response(self, text, speak=True):
+        self._reply_pending = False
+        self._flush_timer.stop()
+        self._set_state(busy=False)
 
-        if self.tts_enabled and not self.is_speaking:
+        if speak and self.tts_enabled:
             self._speak(text)
 
     def _speak(self, text):
-        self.is_speaking = True
-        self.tts_thread = TTSThread(text, self.client)
-        self.tts_thread.finished.connect(self._on_speak_done)
-        self.tts_thread.start()
+        # Latest wins: a new reply interrupts the one still playing
+        self._stop_speech()
+        self._enqueue_speech(text)
+
+    def _stop_speech(self):
+        self._tts_worker.cancel()
+
+    def _enqueue_speech(self, text):
+        self._tts_worker.enqueue(text)
 
-    def _on_speak_done(self):
-        self.is_speaking = False
+    def closeEvent(self, event):
+        self._tts_worker.shutdown()
+        self._tts_worker.wait(2000)
+        super().closeEvent(event)
 
     def _toggle_tts(self, checked):
         self.tts_enabled = checked
-        self.tts_btn.setText("🔊  Voice Response ON" if checked else "🔇  Voice Response OFF")
+        self.tts_btn.setIcon(QIcon(emoji_pixmap("🔊" if checked else "🔇")))
+        self.tts_btn.setText("  Voice Response ON" if checked else "  Voice Response OFF")
 
     def _clear_chat(self):
-        while self.messages_layout.count() > 1:
-            item = self.messages_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-        self.conversation_history = [{"role": "system", "content": SYSTEM_PROMPT}]
+        if self._reply_pending:
+            # A reply is still on its way into the chat being cleared
+            self._stop_speech()
+            self._finish_response("", speak=False)
+        # Also invalidates chunks the finished stream has already queued
+        self._groq.cancel()
+        self._response_bubble = None
+        self._response_label = None
+        # Take from the end so the layout never shifts the remaining items
+        layout = self.messages_layout
+        while layout.count() > 0:
+            item = layout.takeAt(layout.count() - 1)
+            widget = item.widget()
+            if widget:
+                widget.setParent(None)
+                widget.deleteLater()
+        self.conversation_history.clear()
+        self._history_tokens.clear()
+        self._history_total = 0
         QTimer.singleShot(300, self._send_welcome)
 
 
 # ─── ENTRY POINT ───────────────────────────────────────────────────────────────
 def main():
-    if not os.path.exists(".env"):
-        with open(".env", "w") as f:
+    # Exclusive create: one open() call, no exists/open race
+    try:
+        with Path(".env").open("x") as f:
             f.write("# Add your Groq API key here\nGROQ_API_KEY=your_groq_api_key_here\n")
         print("Created .env file — please add your GROQ_API_KEY")
+    except FileExistsError:
+        pass
 
     app = QApplication(sys.argv)
     app.setApplicationName("RAAM")
     app.setApplicationVersion("1.1")
     app.setStyle("Fusion")
+    preload_emoji_cache()
 
     window = RAAMDashboard()
     window.show()
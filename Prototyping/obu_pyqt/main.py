@@ -1,23 +1,155 @@
 import sys
+import os
+import re
+import ctypes
+import ctypes.util
 import socket
+import selectors
 import json
 import time
+import queue
+import threading
+from functools import lru_cache
 import geocoder
 import speech_recognition as sr
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QTextEdit,
     QPushButton, QVBoxLayout, QHBoxLayout, QMessageBox, QFrame
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
-from PyQt6.QtGui import QFont, QColor, QPalette
+from PyQt6.QtGui import QFont, QColor, QPalette, QTextCursor
 
 
 # ================= CONFIG =================
 ESP32_IP = "192.168.137.222"   # RSU IP
 PORT = 5005
 VEHICLE_ID = "CAR_01"
+RSU_TARGETS = [(ESP32_IP, PORT)]   # Every RSU an alert is broadcast to
 STATUS_LISTEN_PORT = 5009      # Receives help-on-the-way updates from relay
+LOCATION_REFRESH_S = 60        # IP geolocation refresh period
+LOCATION_TIMEOUT_S = 5         # HTTP timeout of one IP geolocation lookup
+MIC_RECALIBRATE_S = 300        # Re-measure ambient noise at most this often
+RECORD_LIMIT_S = 15            # Longest voice description per recording
+PHRASE_LIMIT_S = 4             # Each phrase is transcribed while the next is captured
+
+# ================= CLASSIFIER =================
+# One compiled pass finds every keyword; ties resolve in ISSUE_PRIORITY order
+ISSUE_KEYWORDS = re.compile(r"tire|battery|not starting|smoke|engine|accident|crash|collision|fire",
+                            re.IGNORECASE)
+ISSUE_CATEGORIES = {
+    "tire": "Flat Tire",
+    "battery": "Battery Failure",
+    "not starting": "Battery Failure",
+    "smoke": "Engine Problem",
+    "engine": "Engine Problem",
+    "accident": "Accident",
+    "crash": "Accident",
+    "collision": "Accident",
+    "fire": "Vehicle Fire",
+}
+ISSUE_PRIORITY = ("Flat Tire", "Battery Failure", "Engine Problem", "Accident", "Vehicle Fire")
+
+
+def encode_packet(packet):
+    """Serializes a packet compactly, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(packet)
+    return json.dumps(packet, separators=(',', ':')).encode()
+
+
+def decode_packet(data):
+    """Parses a received datagram, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# ================= MULTI-TARGET SEND =================
+# On Linux an alert to several RSUs leaves in one sendmmsg(2) call instead of
+# one sendto() per target; elsewhere it falls back to a sendto() loop.
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+class _SockAddrIn(ctypes.Structure):
+    _fields_ = [
+        ("sin_family", ctypes.c_ushort),
+        ("sin_port", ctypes.c_uint16),
+        ("sin_addr", ctypes.c_ubyte * 4),
+        ("sin_zero", ctypes.c_ubyte * 8),
+    ]
+
+
+def _load_sendmmsg():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fn = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    fn.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    fn.restype = ctypes.c_int
+    return fn
+
+
+_SENDMMSG = _load_sendmmsg()
+
+
+def send_to_all(sock, payload, targets):
+    """Sends one payload to every (ipv4, port) target, in a single syscall where possible."""
+    if _SENDMMSG is None or len(targets) < 2:
+        for addr in targets:
+            sock.sendto(payload, addr)
+        return
+
+    count = len(targets)
+    buf = ctypes.create_string_buffer(payload, len(payload))
+    iov = _IOVec(ctypes.cast(buf, ctypes.c_void_p), len(payload))
+    addrs = (_SockAddrIn * count)()
+    msgs = (_MMsgHdr * count)()
+    for i, (ip, port) in enumerate(targets):
+        addrs[i].sin_family = socket.AF_INET
+        addrs[i].sin_port = socket.htons(port)
+        addrs[i].sin_addr[:] = list(socket.inet_aton(ip))
+        hdr = msgs[i].msg_hdr
+        hdr.msg_name = ctypes.addressof(addrs[i])
+        hdr.msg_namelen = ctypes.sizeof(_SockAddrIn)
+        hdr.msg_iov = ctypes.pointer(iov)
+        hdr.msg_iovlen = 1
+
+    sent = 0
+    while sent < count:
+        first = ctypes.cast(ctypes.addressof(msgs) + sent * ctypes.sizeof(_MMsgHdr),
+                            ctypes.POINTER(_MMsgHdr))
+        n = _SENDMMSG(sock.fileno(), first, count - sent, 0)
+        if n < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        sent += n
+
 
 # ================= COLORS =================
 BG_DEEP    = "#0A0F1E"
@@ -32,32 +164,124 @@ TEXT_SECONDARY = "#7B8BAE"
 TEXT_MUTED  = "#3D4F6E"
 BORDER_CLR = "#1E2D4A"
 
+# ================= STYLES =================
+# Parsed by Qt on every assignment, so the strings are built once up front
+RECORD_STYLE_IDLE = f"""
+    QPushButton {{
+        background-color: {ACCENT_TEAL};
+        color: {BG_DEEP};
+        border: none;
+        border-radius: 10px;
+    }}
+    QPushButton:hover {{ background-color: #00E8BB; }}
+"""
+RECORD_STYLE_ACTIVE = f"""
+    QPushButton {{
+        background-color: {ACCENT_RED};
+        color: white;
+        border: none;
+        border-radius: 10px;
+    }}
+    QPushButton:hover {{ background-color: #F05555; }}
+"""
+SEND_STYLE = RECORD_STYLE_ACTIVE
+STYLE_TEAL = f"color: {ACCENT_TEAL};"
+STYLE_RED = f"color: {ACCENT_RED};"
+STYLE_AMBER = f"color: {ACCENT_AMBER};"
+STYLE_SECONDARY = f"color: {TEXT_SECONDARY};"
+
+
+@lru_cache(maxsize=None)
+def ui_font(size, bold=False):
+    """Shared Segoe UI fonts; created on first use since QFont needs the QApplication."""
+    if bold:
+        return QFont("Segoe UI", size, QFont.Weight.Bold)
+    return QFont("Segoe UI", size)
+
 
 # ================= STATUS LISTENER THREAD =================
 class StatusListenerThread(QThread):
-    """Listens for status updates from relay server (e.g. Car2 ACK, ETA)."""
-    status_received = pyqtSignal(dict)
+    """Listens for status updates from relay server (e.g. Car2 ACK, ETA).
+
+    Every datagram drained in one wakeup is delivered together as a list.
+    """
+    status_received = pyqtSignal(list)
 
     def __init__(self, port):
         super().__init__()
         self.port = port
         self._running = True
+        # stop() writes to this pair to wake the selector; a socketpair works on Windows too
+        self._wake_r, self._wake_w = socket.socketpair()
 
     def run(self):
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        sock.settimeout(1.0)
+        sock.setblocking(False)
         sock.bind(("0.0.0.0", self.port))
 
+        sel = selectors.DefaultSelector()
+        sel.register(sock, selectors.EVENT_READ)
+        sel.register(self._wake_r, selectors.EVENT_READ)
+
+        try:
+            while self._running:
+                # Sleeps until a packet arrives or stop() is called
+                sel.select()
+                batch = []
+                while True:
+                    try:
+                        data, addr = sock.recvfrom(2048)
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    except OSError:
+                        continue
+                    try:
+                        pkt = decode_packet(data)
+                    except ValueError:
+                        continue
+                    if isinstance(pkt, dict):
+                        batch.append(pkt)
+                if batch:
+                    self.status_received.emit(batch)
+        finally:
+            sel.close()
+            sock.close()
+            self._wake_r.close()
+            self._wake_w.close()
+
+    def stop(self):
+        self._running = False
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
+
+
+# ================= LOCATION THREAD =================
+class LocationThread(QThread):
+    """Refreshes the IP-based location in the background so sending never waits on HTTP."""
+    location_ready = pyqtSignal(float, float)
+
+    def __init__(self, interval):
+        super().__init__()
+        self.interval = interval
+        self._running = True
+
+    def run(self):
         while self._running:
             try:
-                data, addr = sock.recvfrom(4096)
-                pkt = json.loads(data.decode())
-                self.status_received.emit(pkt)
-            except socket.timeout:
-                continue
+                g = geocoder.ip('me', timeout=LOCATION_TIMEOUT_S)
+                if g.ok:
+                    lat, lon = g.latlng
+                    self.location_ready.emit(lat, lon)
             except Exception:
-                continue
+                pass
+            # Sleep in short steps so stop() takes effect promptly
+            for _ in range(self.interval):
+                if not self._running:
+                    break
+                time.sleep(1)
 
     def stop(self):
         self._running = False
@@ -65,46 +289,83 @@ class StatusListenerThread(QThread):
 
 # ================= VOICE RECORDER THREAD =================
 class VoiceRecorderThread(QThread):
-    """Background thread that records from the microphone and transcribes."""
+    """Background thread that records from the microphone and transcribes.
+
+    Speech is captured in short phrases that a helper thread sends to Google
+    while the next phrase is recorded, so text appears phrase by phrase instead
+    of after the whole recording. The recognizer and microphone are owned by
+    CarOBU and reused across sessions; ambient-noise calibration only runs when
+    ``calibrate`` is set.
+    """
 
     transcription_ready = pyqtSignal(str)
     error_occurred = pyqtSignal(str)
     status_update = pyqtSignal(str)
 
-    def __init__(self):
+    def __init__(self, recognizer, microphone, calibrate):
         super().__init__()
+        self.recognizer = recognizer
+        self.microphone = microphone
+        self.calibrate = calibrate
         self._stop_flag = False
 
     def stop(self):
         self._stop_flag = True
 
     def run(self):
-        recognizer = sr.Recognizer()
+        recognizer = self.recognizer
+        phrases = queue.Queue()
+        self._understood = 0
+        worker = threading.Thread(target=self._transcribe, args=(phrases,), daemon=True)
+        heard = False
         try:
-            with sr.Microphone() as source:
-                self.status_update.emit("🎙️ Adjusting for ambient noise...")
-                recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            with self.microphone as source:
+                if self.calibrate:
+                    self.status_update.emit("🎙️ Adjusting for ambient noise...")
+                    recognizer.adjust_for_ambient_noise(source, duration=0.5)
 
                 self.status_update.emit("🎙️ Listening... Speak now!")
-                audio = recognizer.listen(source, timeout=10, phrase_time_limit=15)
-
-                if self._stop_flag:
-                    return
-
-                self.status_update.emit("⏳ Transcribing...")
-                text = recognizer.recognize_google(audio)
-                self.transcription_ready.emit(text)
+                worker.start()
+                deadline = time.monotonic() + RECORD_LIMIT_S
+                while not self._stop_flag and time.monotonic() < deadline:
+                    try:
+                        # A short pause after speech ends the recording
+                        audio = recognizer.listen(source, timeout=2 if heard else 10,
+                                                  phrase_time_limit=PHRASE_LIMIT_S)
+                    except sr.WaitTimeoutError:
+                        if heard:
+                            break
+                        raise
+                    heard = True
+                    phrases.put(audio)
 
         except sr.WaitTimeoutError:
             self.error_occurred.emit("No speech detected. Please try again.")
-        except sr.UnknownValueError:
-            self.error_occurred.emit("Could not understand audio. Please speak clearly.")
-        except sr.RequestError as e:
-            self.error_occurred.emit(f"Speech service error: {e}")
         except OSError as e:
             self.error_occurred.emit(f"Microphone error: {e}")
         except Exception as e:
             self.error_occurred.emit(f"Recording error: {e}")
+        finally:
+            phrases.put(None)
+            if worker.is_alive():
+                worker.join()
+
+        if heard and not self._understood and not self._stop_flag:
+            self.error_occurred.emit("Could not understand audio. Please speak clearly.")
+
+    def _transcribe(self, phrases):
+        while (audio := phrases.get()) is not None:
+            if self._stop_flag:
+                continue
+            try:
+                text = self.recognizer.recognize_google(audio)
+            except sr.UnknownValueError:
+                continue
+            except sr.RequestError as e:
+                self.error_occurred.emit(f"Speech service error: {e}")
+                continue
+            self._understood += 1
+            self.transcription_ready.emit(text)
 
 
 class CarOBU(QWidget):
@@ -116,10 +377,31 @@ class CarOBU(QWidget):
         self.setFixedSize(500, 600)
 
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 65536)
+        try:
+            self.socket.setsockopt(socket.IPPROTO_IP, socket.IP_TOS, 0x10)  # low delay
+        except (AttributeError, OSError):
+            pass
+        # One packet dict reused for every send; only the per-alert fields change
+        self._packet_template = {
+            "vehicle_id": VEHICLE_ID,
+            "issue": "",
+            "raw_description": "",
+            "latitude": 0.0,
+            "longitude": 0.0,
+            "timestamp": "",
+            "hop_trace": [VEHICLE_ID],
+        }
         self.recorder_thread = None
+        self._cached_latlon = None   # (lat, lon) once LocationThread has a fix
+        # Speech input state shared by every recording session
+        self._recognizer = sr.Recognizer()
+        self._mic = None
+        self._calibrated_at = None
 
         self.init_ui()
         self.start_status_listener()
+        self.start_location_updates()
 
     # ---------------- UI ----------------
     def init_ui(self):
@@ -148,14 +430,14 @@ class CarOBU(QWidget):
         h_layout.setContentsMargins(20, 0, 20, 0)
 
         title = QLabel("◈ CAR 1 — OBU")
-        title.setFont(QFont("Segoe UI", 14, QFont.Weight.Bold))
+        title.setFont(ui_font(14, bold=True))
         title.setStyleSheet(f"color: {ACCENT_AMBER}; letter-spacing: 2px;")
         h_layout.addWidget(title)
         h_layout.addStretch()
 
         self.header_status = QLabel("● READY")
-        self.header_status.setFont(QFont("Segoe UI", 9))
-        self.header_status.setStyleSheet(f"color: {ACCENT_TEAL};")
+        self.header_status.setFont(ui_font(9))
+        self.header_status.setStyleSheet(STYLE_TEAL)
         h_layout.addWidget(self.header_status)
 
         layout.addWidget(header)
@@ -181,7 +463,7 @@ class CarOBU(QWidget):
         ic_layout.setSpacing(8)
 
         input_title = QLabel("DESCRIBE VEHICLE PROBLEM")
-        input_title.setFont(QFont("Segoe UI", 8, QFont.Weight.Bold))
+        input_title.setFont(ui_font(8, bold=True))
         input_title.setStyleSheet(f"color: {TEXT_MUTED}; letter-spacing: 2px;")
         ic_layout.addWidget(input_title)
 
@@ -209,31 +491,15 @@ class CarOBU(QWidget):
 
         self.record_button = QPushButton("🎤 Record Voice")
         self.record_button.setFixedHeight(42)
-        self.record_button.setFont(QFont("Segoe UI", 10, QFont.Weight.Bold))
-        self.record_button.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {ACCENT_TEAL};
-                color: {BG_DEEP};
-                border: none;
-                border-radius: 10px;
-            }}
-            QPushButton:hover {{ background-color: #00E8BB; }}
-        """)
+        self.record_button.setFont(ui_font(10, bold=True))
+        self.record_button.setStyleSheet(RECORD_STYLE_IDLE)
         self.record_button.clicked.connect(self.toggle_recording)
         btn_row.addWidget(self.record_button)
 
         self.send_button = QPushButton("🚨 Send Emergency")
         self.send_button.setFixedHeight(42)
-        self.send_button.setFont(QFont("Segoe UI", 10, QFont.Weight.Bold))
-        self.send_button.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {ACCENT_RED};
-                color: white;
-                border: none;
-                border-radius: 10px;
-            }}
-            QPushButton:hover {{ background-color: #F05555; }}
-        """)
+        self.send_button.setFont(ui_font(10, bold=True))
+        self.send_button.setStyleSheet(SEND_STYLE)
         self.send_button.clicked.connect(self.send_emergency)
         btn_row.addWidget(self.send_button)
 
@@ -254,13 +520,13 @@ class CarOBU(QWidget):
         sc_layout.setSpacing(6)
 
         st_title = QLabel("STATUS")
-        st_title.setFont(QFont("Segoe UI", 8, QFont.Weight.Bold))
+        st_title.setFont(ui_font(8, bold=True))
         st_title.setStyleSheet(f"color: {TEXT_MUTED}; letter-spacing: 2px;")
         sc_layout.addWidget(st_title)
 
         self.status_label = QLabel("Ready to send emergency alert")
-        self.status_label.setFont(QFont("Segoe UI", 11))
-        self.status_label.setStyleSheet(f"color: {TEXT_SECONDARY};")
+        self.status_label.setFont(ui_font(11))
+        self.status_label.setStyleSheet(STYLE_SECONDARY)
         self.status_label.setWordWrap(True)
         sc_layout.addWidget(self.status_label)
 
@@ -280,25 +546,25 @@ class CarOBU(QWidget):
         hc_layout.setSpacing(6)
 
         help_title = QLabel("🆘 HELP STATUS")
-        help_title.setFont(QFont("Segoe UI", 8, QFont.Weight.Bold))
+        help_title.setFont(ui_font(8, bold=True))
         help_title.setStyleSheet(f"color: {ACCENT_TEAL}; letter-spacing: 2px;")
         hc_layout.addWidget(help_title)
 
         self.help_label = QLabel("")
-        self.help_label.setFont(QFont("Segoe UI", 13, QFont.Weight.Bold))
-        self.help_label.setStyleSheet(f"color: {ACCENT_AMBER};")
+        self.help_label.setFont(ui_font(13, bold=True))
+        self.help_label.setStyleSheet(STYLE_AMBER)
         self.help_label.setWordWrap(True)
         hc_layout.addWidget(self.help_label)
 
         self.help_eta = QLabel("")
-        self.help_eta.setFont(QFont("Segoe UI", 18, QFont.Weight.Bold))
+        self.help_eta.setFont(ui_font(18, bold=True))
         self.help_eta.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.help_eta.setStyleSheet(f"color: {ACCENT_TEAL};")
+        self.help_eta.setStyleSheet(STYLE_TEAL)
         hc_layout.addWidget(self.help_eta)
 
         self.help_detail = QLabel("")
-        self.help_detail.setFont(QFont("Segoe UI", 10))
-        self.help_detail.setStyleSheet(f"color: {TEXT_SECONDARY};")
+        self.help_detail.setFont(ui_font(10))
+        self.help_detail.setStyleSheet(STYLE_SECONDARY)
         hc_layout.addWidget(self.help_detail)
 
         self.help_card.hide()
@@ -313,8 +579,10 @@ class CarOBU(QWidget):
         self.status_listener.status_received.connect(self.on_status_received)
         self.status_listener.start()
 
-    def on_status_received(self, packet):
-        if packet.get("type") == "HELP_COMING":
+    def on_status_received(self, packets):
+        # The card shows one helper, so only the newest HELP_COMING in a burst matters
+        packet = next((p for p in reversed(packets) if p.get("type") == "HELP_COMING"), None)
+        if packet is not None:
             helper_id = packet.get("helper_id", "Unknown")
             eta = packet.get("eta_minutes", "?")
             dist = packet.get("distance_km", "?")
@@ -325,7 +593,16 @@ class CarOBU(QWidget):
             self.help_detail.setText(f"Distance: {dist} km away")
 
             self.header_status.setText("● HELP ON THE WAY")
-            self.header_status.setStyleSheet(f"color: {ACCENT_TEAL};")
+            self.header_status.setStyleSheet(STYLE_TEAL)
+
+    # ---------------- LOCATION UPDATES ----------------
+    def start_location_updates(self):
+        self.location_thread = LocationThread(LOCATION_REFRESH_S)
+        self.location_thread.location_ready.connect(self.on_location_ready)
+        self.location_thread.start()
+
+    def on_location_ready(self, lat, lon):
+        self._cached_latlon = (lat, lon)
 
     # ---------------- VOICE RECORDING ----------------
     def toggle_recording(self):
@@ -333,19 +610,22 @@ class CarOBU(QWidget):
             self.recorder_thread.stop()
             self.recorder_thread.quit()
             self.record_button.setText("🎤 Record Voice")
-            self.record_button.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {ACCENT_TEAL};
-                    color: {BG_DEEP};
-                    border: none;
-                    border-radius: 10px;
-                }}
-                QPushButton:hover {{ background-color: #00E8BB; }}
-            """)
+            self.record_button.setStyleSheet(RECORD_STYLE_IDLE)
             self.status_label.setText("Recording stopped")
-            self.status_label.setStyleSheet(f"color: {TEXT_SECONDARY};")
+            self.status_label.setStyleSheet(STYLE_SECONDARY)
         else:
-            self.recorder_thread = VoiceRecorderThread()
+            if self._mic is None:
+                try:
+                    self._mic = sr.Microphone()
+                except (OSError, AttributeError) as e:
+                    self.on_recording_error(f"Microphone error: {e}")
+                    return
+            now = time.monotonic()
+            calibrate = self._calibrated_at is None or now - self._calibrated_at > MIC_RECALIBRATE_S
+            if calibrate:
+                self._calibrated_at = now
+
+            self.recorder_thread = VoiceRecorderThread(self._recognizer, self._mic, calibrate)
             self.recorder_thread.transcription_ready.connect(self.on_transcription)
             self.recorder_thread.error_occurred.connect(self.on_recording_error)
             self.recorder_thread.status_update.connect(self.on_voice_status)
@@ -353,67 +633,51 @@ class CarOBU(QWidget):
             self.recorder_thread.start()
 
             self.record_button.setText("⏹ Stop Recording")
-            self.record_button.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {ACCENT_RED};
-                    color: white;
-                    border: none;
-                    border-radius: 10px;
-                }}
-                QPushButton:hover {{ background-color: #F05555; }}
-            """)
+            self.record_button.setStyleSheet(RECORD_STYLE_ACTIVE)
 
     def on_transcription(self, text):
-        current = self.issue_input.toPlainText()
-        if current:
-            self.issue_input.setPlainText(current + " " + text)
-        else:
-            self.issue_input.setPlainText(text)
+        # Append at the end instead of reading and re-setting the whole document
+        cursor = self.issue_input.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text if self.issue_input.document().isEmpty() else " " + text)
+        self.issue_input.setTextCursor(cursor)
         self.status_label.setText("Voice transcribed ✅")
-        self.status_label.setStyleSheet(f"color: {ACCENT_TEAL};")
+        self.status_label.setStyleSheet(STYLE_TEAL)
 
     def on_recording_error(self, msg):
         self.status_label.setText(msg)
-        self.status_label.setStyleSheet(f"color: {ACCENT_RED};")
+        self.status_label.setStyleSheet(STYLE_RED)
 
     def on_voice_status(self, msg):
         self.status_label.setText(msg)
-        self.status_label.setStyleSheet(f"color: {ACCENT_AMBER};")
+        self.status_label.setStyleSheet(STYLE_AMBER)
 
     def on_recording_finished(self):
         self.record_button.setText("🎤 Record Voice")
-        self.record_button.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {ACCENT_TEAL};
-                color: {BG_DEEP};
-                border: none;
-                border-radius: 10px;
-            }}
-            QPushButton:hover {{ background-color: #00E8BB; }}
-        """)
+        self.record_button.setStyleSheet(RECORD_STYLE_IDLE)
 
     # ---------------- GPS ----------------
     def get_location(self):
-        g = geocoder.ip('me')
-        if g.ok:
-            return g.latlng
-        return [0, 0]
+        # Last fix from LocationThread; before the first one, look it up directly
+        if self._cached_latlon is not None:
+            return self._cached_latlon
+        try:
+            g = geocoder.ip('me', timeout=LOCATION_TIMEOUT_S)
+            if g.ok:
+                self._cached_latlon = tuple(g.latlng)
+                return self._cached_latlon
+        except Exception:
+            pass
+        return (0, 0)
 
     # ---------------- CLASSIFIER ----------------
     def classify_issue(self, text):
-        text = text.lower()
-        if "tire" in text:
-            return "Flat Tire"
-        elif "battery" in text or "not starting" in text:
-            return "Battery Failure"
-        elif "smoke" in text or "engine" in text:
-            return "Engine Problem"
-        elif "accident" in text or "crash" in text or "collision" in text:
-            return "Accident"
-        elif "fire" in text:
-            return "Vehicle Fire"
-        else:
-            return "General Breakdown"
+        # Only the short matched keywords are lowercased, never the whole description
+        found = {ISSUE_CATEGORIES[k.lower()] for k in ISSUE_KEYWORDS.findall(text)}
+        for category in ISSUE_PRIORITY:
+            if category in found:
+                return category
+        return "General Breakdown"
 
     # ---------------- SEND FUNCTION ----------------
     def send_emergency(self):
@@ -426,39 +690,41 @@ class CarOBU(QWidget):
         lat, lon = self.get_location()
         classified_issue = self.classify_issue(issue_text)
 
-        packet = {
-            "vehicle_id": VEHICLE_ID,
-            "issue": classified_issue,
-            "raw_description": issue_text,
-            "latitude": lat,
-            "longitude": lon,
-            "timestamp": time.strftime("%H:%M:%S"),
-            "hop_trace": [VEHICLE_ID]
-        }
+        now = time.localtime()
+        packet = self._packet_template
+        packet["issue"] = classified_issue
+        packet["raw_description"] = issue_text
+        packet["latitude"] = lat
+        packet["longitude"] = lon
+        packet["timestamp"] = f"{now.tm_hour:02d}:{now.tm_min:02d}:{now.tm_sec:02d}"
 
-        message = json.dumps(packet)
+        message = encode_packet(packet)
 
         try:
-            print("Sending packet to:", ESP32_IP, PORT)
+            print("Sending packet to:", RSU_TARGETS)
             print("Packet Data:", packet)
 
-            self.socket.sendto(message.encode(), (ESP32_IP, PORT))
+            send_to_all(self.socket, message, RSU_TARGETS)
 
             self.status_label.setText("Emergency Sent Successfully 🚨")
-            self.status_label.setStyleSheet(f"color: {ACCENT_TEAL};")
+            self.status_label.setStyleSheet(STYLE_TEAL)
 
             self.header_status.setText("● EMERGENCY SENT")
-            self.header_status.setStyleSheet(f"color: {ACCENT_RED};")
+            self.header_status.setStyleSheet(STYLE_RED)
 
         except Exception as e:
             self.status_label.setText(f"Failed to Send: {e}")
-            self.status_label.setStyleSheet(f"color: {ACCENT_RED};")
+            self.status_label.setStyleSheet(STYLE_RED)
             QMessageBox.critical(self, "Error", str(e))
 
     def closeEvent(self, event):
         if hasattr(self, 'status_listener'):
             self.status_listener.stop()
             self.status_listener.wait(2000)
+        if hasattr(self, 'location_thread'):
+            self.location_thread.stop()
+            # Outlast a lookup in progress so the thread is never destroyed while running
+            self.location_thread.wait((LOCATION_TIMEOUT_S + 2) * 1000)
         event.accept()
 
 
@@ -9,6 +9,8 @@ adds synthetic TPMS data, and distributes to:
 Also receives ACK from Car2 with ETA info.
 """
 
+import os
+import sys
 import socket
 import json
 import math
@@ -16,7 +18,26 @@ import random
 import time
 import threading
 import queue
-from datetime import datetime
+import ctypes
+import ctypes.util
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # ================= CONFIG =================
 LISTEN_PORT       = 5005              # Same port ESP32 forwards to
@@ -28,53 +49,117 @@ DASHBOARD_IP      = "192.168.137.161" # Dashboard on Laptop 1
 DASHBOARD_PORT    = 5008
 CAR1_IP           = "192.168.137.161" # Car1 OBU on Laptop 1
 CAR1_STATUS_PORT  = 5009
-
-# Shared queue for dashboard
-dashboard_queue = queue.Queue()
-
-# Store latest state
+MAPS_LINK         = "https://www.google.com/maps?q={},{}"
+DEBUG_HAVERSINE_CACHE = False         # Print distance-cache hit stats on every ACK
+SHORT_RANGE_DEG   = 0.5               # Points closer than this (~55 km) use the flat-earth approximation
+SOCKET_BUFFER_BYTES = 4 * 1024 * 1024 # Requested kernel send/recv buffer (capped by the OS)
+SAFE_UDP_PAYLOAD  = 1400              # Bytes per datagram that fit one Ethernet frame unfragmented
+LOG_LEVEL         = logging.INFO      # WARNING keeps only failures in production
+WORK_QUEUE_SIZE   = 1024              # Received packets waiting for handlers; newer ones drop when full
+HANDLER_THREADS   = 4                 # Threads running the packet handlers, one work queue each
+
+# Event logging: handlers only enqueue records, a background listener writes them
+log = logging.getLogger("relay")
+log.setLevel(LOG_LEVEL)
+log.propagate = False
+_log_queue = queue.SimpleQueue()
+log.addHandler(QueueHandler(_log_queue))
+_log_listener = QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+RULE = "=" * 60
+
+# Shared queue for dashboard (dicts or pre-encoded bytes); drained by dashboard_flush_loop
+dashboard_queue = queue.SimpleQueue()
+DASHBOARD_BATCH_MAX = 100      # Messages per dashboard datagram at most
+DASHBOARD_BATCH_WINDOW = 0.02  # Seconds to wait for more messages to coalesce
+
+# Listeners only receive; packets wait in a bounded queue per handler thread.
+# A sender's packets always land in the same queue, so they are handled in order.
+_work_qs = [queue.Queue(maxsize=WORK_QUEUE_SIZE // HANDLER_THREADS)
+            for _ in range(HANDLER_THREADS)]
+dropped_packets = 0
+
+# Latest state as an immutable-by-convention snapshot: readers just take a
+# reference, writers publish a new dict via update_state() under state_lock.
+state_lock = threading.Lock()
 latest_data = {
     "sensor_data": None,
     "tpms_data": None,
     "emergency": None,
     "car2_ack": None,
     "car2_eta": None,
+    "emergency_rad": None,   # accident (lat, lon) in radians, converted once per emergency
+    "helpers": {},           # helper car id -> last reported (lat, lon)
 }
 
 
+def update_state(**changes):
+    """Publish a new snapshot of latest_data with changes applied."""
+    global latest_data
+    with state_lock:
+        latest_data = {**latest_data, **changes}
+
+
+# ================= TIMESTAMPS =================
+_hms_cache = (0, "")   # (epoch second, "%H:%M:%S"), swapped as one tuple
+
+
+def hms():
+    """Current local time as HH:MM:SS, formatted at most once per second."""
+    global _hms_cache
+    now = int(time.time())
+    sec, text = _hms_cache
+    if now != sec:
+        text = time.strftime("%H:%M:%S", time.localtime(now))
+        _hms_cache = (now, text)
+    return text
+
+
 # ================= TPMS SYNTHETIC DATA =================
+def clamp(value, lo, hi):
+    return lo if value < lo else hi if value > hi else value
+
+
 class TPMSGenerator:
     """Generates realistic TPMS data for 4 wheels."""
 
     def __init__(self):
         self.base_pressure = {"FL": 33.0, "FR": 33.5, "RL": 32.0, "RR": 32.5}
         self.base_temp = {"FL": 35.0, "FR": 36.0, "RL": 34.0, "RR": 35.5}
+        # (wheel, base pressure, base temp, pressure phase, temp phase), fixed per run
+        self.wheels = [
+            (w, self.base_pressure[w], self.base_temp[w], hash(w) % 10, hash(w) % 7)
+            for w in ("FL", "FR", "RL", "RR")
+        ]
         self.tick = 0
 
     def generate(self):
+        """Returns a fresh reading; published snapshots are never changed afterwards."""
+        sin, uniform = math.sin, random.uniform
         self.tick += 1
-        tpms = {}
-        for wheel in ["FL", "FR", "RL", "RR"]:
+        p_angle = self.tick * 0.05
+        t_angle = self.tick * 0.03
+        out = {}
+        for wheel, base_p, base_t, p_phase, t_phase in self.wheels:
             # Pressure: slow drift + small random jitter
-            drift = math.sin(self.tick * 0.05 + hash(wheel) % 10) * 1.5
-            jitter = random.uniform(-0.3, 0.3)
-            pressure = round(self.base_pressure[wheel] + drift + jitter, 1)
+            drift = sin(p_angle + p_phase) * 1.5
+            jitter = uniform(-0.3, 0.3)
+            pressure = round(base_p + drift + jitter, 1)
 
             # Temperature: increases slightly over time with jitter
-            temp_drift = math.sin(self.tick * 0.03 + hash(wheel) % 7) * 5
-            temp_jitter = random.uniform(-1.0, 1.0)
-            temp = round(self.base_temp[wheel] + temp_drift + temp_jitter, 1)
+            temp_drift = sin(t_angle + t_phase) * 5
+            temp_jitter = uniform(-1.0, 1.0)
+            temp = round(base_t + temp_drift + temp_jitter, 1)
 
             # Clamp values
-            pressure = max(25.0, min(42.0, pressure))
-            temp = max(20.0, min(90.0, temp))
+            pressure = clamp(pressure, 25.0, 42.0)
+            temp = clamp(temp, 20.0, 90.0)
 
-            tpms[wheel] = {
+            out[wheel] = {
                 "pressure_psi": pressure,
                 "temperature_c": temp,
                 "status": "LOW" if pressure < 28 else "HIGH" if pressure > 38 else "OK"
             }
-        return tpms
+        return out
 
 
 tpms_gen = TPMSGenerator()
@@ -82,8 +167,31 @@ tpms_gen = TPMSGenerator()
 
 # ================= HAVERSINE =================
 def haversine_distance(lat1, lon1, lat2, lon2):
-    """Calculate distance in km between two GPS coordinates."""
-    R = 6371  # Earth radius in km
+    """Calculate distance in km between two GPS coordinates.
+
+    Coordinates are snapped to 4 decimals (~11 m) so repeated ACKs from a car
+    that has barely moved are answered from the cache. Nearby points use the
+    equirectangular approximation, within 0.5% of haversine at that range.
+    """
+    return _haversine_cached(round(lat1, 4), round(lon1, 4), round(lat2, 4), round(lon2, 4))
+
+
+@lru_cache(maxsize=4096)
+def _haversine_cached(lat1, lon1, lat2, lon2):
+    if abs(lat2 - lat1) < SHORT_RANGE_DEG and abs(lon2 - lon1) < SHORT_RANGE_DEG:
+        return approx_distance_km(lat1, lon1, lat2, lon2)
+    return _haversine_km(lat1, lon1, lat2, lon2)
+
+
+def approx_distance_km(lat1, lon1, lat2, lon2):
+    """Equirectangular distance in km; accurate only for points tens of km apart."""
+    x = math.radians(lon2 - lon1) * math.cos(math.radians((lat1 + lat2) * 0.5))
+    y = math.radians(lat2 - lat1)
+    return 6371.0 * math.sqrt(x * x + y * y)
+
+
+def _haversine_km(lat1, lon1, lat2, lon2):
+    R = 6371.0  # Earth radius in km
     dlat = math.radians(lat2 - lat1)
     dlon = math.radians(lon2 - lon1)
     a = (math.sin(dlat / 2) ** 2 +
@@ -93,178 +201,394 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     return R * c
 
 
-def calculate_eta(lat1, lon1, lat2, lon2, speed_kmh=40):
-    """Calculate ETA in minutes assuming average speed."""
-    dist = haversine_distance(lat1, lon1, lat2, lon2)
+# With numba installed, cache misses run as native code; compiled once at import
+# for the one signature used and kept in __pycache__ for the next start.
+if njit is not None:
+    _jit = njit("float64(float64, float64, float64, float64)", cache=True)
+    _haversine_km = _jit(_haversine_km)
+    approx_distance_km = _jit(approx_distance_km)
+
+
+def haversine_np(lat1, lon1, lat2, lon2):
+    """Vectorised haversine: km from each (lat1[i], lon1[i]) to (lat2, lon2), in degrees."""
+    return _haversine_rad_np(np.radians(lat1), np.radians(lon1),
+                             math.radians(lat2), math.radians(lon2))
+
+
+def _haversine_rad_np(lat1, lon1, lat2, lon2):
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * math.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 6371.0 * 2 * np.arcsin(np.sqrt(a))
+
+
+def helper_distances(helpers, target_deg, target_rad):
+    """Distances in km from every helper (lat, lon) to the target location.
+
+    Several helpers are handled in one NumPy pass using the target's cached
+    radians; a single helper (or no NumPy) takes the scalar path.
+    """
+    if np is not None and len(helpers) > 1:
+        pts = np.asarray(helpers, dtype=float)
+        return _haversine_rad_np(np.radians(pts[:, 0]), np.radians(pts[:, 1]), *target_rad).tolist()
+    return [haversine_distance(lat, lon, *target_deg) for lat, lon in helpers]
+
+
+def eta_minutes(dist_km, speed_kmh=40):
+    """ETA in minutes for a distance at an average speed."""
     if speed_kmh <= 0:
         return 999
-    time_hours = dist / speed_kmh
+    time_hours = dist_km / speed_kmh
     return round(time_hours * 60, 1)
 
 
+def calculate_eta(lat1, lon1, lat2, lon2, speed_kmh=40):
+    """Calculate ETA in minutes assuming average speed."""
+    return eta_minutes(haversine_distance(lat1, lon1, lat2, lon2), speed_kmh)
+
+
+# ================= JSON CODEC =================
+# orjson when installed (bytes in/out, no .encode()/.decode() step); stdlib json
+# otherwise. orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+# keep catching the stdlib exception either way.
+if orjson is not None:
+    dumps = orjson.dumps
+    loads = orjson.loads
+else:
+    def dumps(data):
+        return json.dumps(data).encode()
+
+    loads = json.loads
+
+
+def dumps_typed(head, fields):
+    """Encode fields as a JSON object after a pre-encoded '{"type":...,' head.
+
+    Only the variable part is serialised per message; fields must not be empty.
+    """
+    return head + dumps(fields)[1:]
+
+
+_HOSPITAL_HEAD = b'{"type":"EMERGENCY_ALERT",'
+_DASHBOARD_EMERGENCY_HEAD = b'{"type":"EMERGENCY",'
+_TPMS_UPDATE_HEAD = b'{"type":"TPMS_UPDATE",'
+
+
+# ================= SOCKET SETUP =================
+def tune_socket(sock, share_port=False):
+    """Enlarge kernel buffers so bursts queue instead of dropping.
+
+    With share_port, the socket also gets SO_REUSEADDR, plus SO_REUSEPORT where
+    the platform has it, so the listener pool can share one port. Other sockets
+    keep their port exclusive, so a second relay instance fails to bind.
+    """
+    for opt in (socket.SO_RCVBUF, socket.SO_SNDBUF):
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, opt, SOCKET_BUFFER_BYTES)
+        except OSError:
+            pass
+    if share_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    return sock
+
+
 # ================= UDP SEND HELPER =================
+# One socket serves every outgoing datagram instead of a socket per send
+_SEND_SOCK = tune_socket(socket.socket(socket.AF_INET, socket.SOCK_DGRAM))
+_SEND_SOCK.setblocking(False)
+
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+class _SockAddrIn(ctypes.Structure):
+    _fields_ = [
+        ("sin_family", ctypes.c_ushort),
+        ("sin_port", ctypes.c_uint16),
+        ("sin_addr", ctypes.c_ubyte * 4),
+        ("sin_zero", ctypes.c_ubyte * 8),
+    ]
+
+
+def _load_sendmmsg():
+    """Returns libc's sendmmsg on Linux, or None where it isn't available."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fn = libc.sendmmsg
+    except (OSError, AttributeError):
+        return None
+    fn.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    fn.restype = ctypes.c_int
+    return fn
+
+
+_SENDMMSG = _load_sendmmsg()
+
+
+def check_payload_size(payload, ip, port):
+    """Warn when a datagram is too big for one frame and will be IP-fragmented."""
+    if len(payload) > SAFE_UDP_PAYLOAD:
+        log.warning("  ⚠ %d-byte payload to %s:%s exceeds the %d-byte safe MTU",
+                    len(payload), ip, port, SAFE_UDP_PAYLOAD)
+
+
 def udp_send(data, ip, port):
     """Send a JSON packet via UDP."""
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        message = json.dumps(data).encode()
-        sock.sendto(message, (ip, port))
-        sock.close()
-        print(f"  → Sent to {ip}:{port}")
+        udp_send_bytes(dumps(data), ip, port)
     except Exception as e:
-        print(f"  ✗ Failed to send to {ip}:{port}: {e}")
+        log.warning("  ✗ Failed to send to %s:%s: %s", ip, port, e)
+
+
+def udp_send_bytes(payload, ip, port):
+    """Send an already-encoded datagram via UDP."""
+    check_payload_size(payload, ip, port)
+    try:
+        _SEND_SOCK.sendto(payload, (ip, port))
+        log.info("  → Sent to %s:%s", ip, port)
+    except Exception as e:
+        log.warning("  ✗ Failed to send to %s:%s: %s", ip, port, e)
+
+
+def _sendmmsg(payloads, targets):
+    """Sends payloads[i] to targets[i] via sendmmsg(2); returns how many were sent."""
+    count = len(payloads)
+    bufs = [ctypes.create_string_buffer(p, len(p)) for p in payloads]
+    iovs = (_IOVec * count)()
+    addrs = (_SockAddrIn * count)()
+    msgs = (_MMsgHdr * count)()
+    for i, (payload, (ip, port)) in enumerate(zip(payloads, targets)):
+        iovs[i].iov_base = ctypes.cast(bufs[i], ctypes.c_void_p)
+        iovs[i].iov_len = len(payload)
+        addrs[i].sin_family = socket.AF_INET
+        addrs[i].sin_port = socket.htons(port)
+        addrs[i].sin_addr[:] = list(socket.inet_aton(ip))
+        hdr = msgs[i].msg_hdr
+        hdr.msg_name = ctypes.addressof(addrs[i])
+        hdr.msg_namelen = ctypes.sizeof(_SockAddrIn)
+        hdr.msg_iov = ctypes.pointer(iovs[i])
+        hdr.msg_iovlen = 1
+
+    sent = 0
+    while sent < count:
+        first = ctypes.cast(ctypes.addressof(msgs) + sent * ctypes.sizeof(_MMsgHdr),
+                            ctypes.POINTER(_MMsgHdr))
+        n = _SENDMMSG(_SEND_SOCK.fileno(), first, count - sent, 0)
+        if n < 0:
+            err = ctypes.get_errno()
+            log.warning("  ✗ sendmmsg failed: %s", os.strerror(err))
+            break
+        sent += n
+    return sent
+
+
+def udp_send_batch(messages):
+    """Send several (data, ip, port) JSON packets, in one syscall on Linux.
+
+    data may already be encoded bytes.
+    """
+    payloads = [data if isinstance(data, bytes) else dumps(data) for data, _, _ in messages]
+    targets = [(ip, port) for _, ip, port in messages]
+    for payload, (ip, port) in zip(payloads, targets):
+        check_payload_size(payload, ip, port)
+    sent = 0
+    if _SENDMMSG is not None and len(messages) > 1:
+        sent = _sendmmsg(payloads, targets)
+        for ip, port in targets[:sent]:
+            log.info("  → Sent to %s:%s", ip, port)
+    # Whatever sendmmsg didn't take goes out one by one
+    for payload, (ip, port) in zip(payloads[sent:], targets[sent:]):
+        try:
+            _SEND_SOCK.sendto(payload, (ip, port))
+            log.info("  → Sent to %s:%s", ip, port)
+        except Exception as e:
+            log.warning("  ✗ Failed to send to %s:%s: %s", ip, port, e)
 
 
 # ================= HANDLE INCOMING FROM ESP32 =================
 def handle_esp32_packet(data, addr):
     """Process enriched packet from ESP32 RSU."""
-    print(f"\n{'='*60}")
-    print(f"📡 Received from ESP32 RSU ({addr[0]}:{addr[1]})")
-    print(f"{'='*60}")
+    log.info("\n%s\n📡 Received from ESP32 RSU (%s:%s)\n%s", RULE, addr[0], addr[1], RULE)
 
     try:
-        packet = json.loads(data.decode())
+        packet = loads(data)
     except json.JSONDecodeError:
-        print("  ✗ Invalid JSON from ESP32")
+        log.warning("  ✗ Invalid JSON from ESP32")
         return
 
-    print(f"  Vehicle: {packet.get('vehicle_id', 'N/A')}")
-    print(f"  Issue: {packet.get('issue', 'N/A')}")
-    print(f"  Hop Trace: {packet.get('hop_trace', [])}")
+    log.info("  Vehicle: %s\n  Issue: %s\n  Hop Trace: %s",
+             packet.get('vehicle_id', 'N/A'), packet.get('issue', 'N/A'), packet.get('hop_trace', []))
 
     # Extract sensor data from ESP32's enrichment
     sensor_data = packet.get("rsu_environment", {})
     env_status = packet.get("environment_status", "Unknown")
 
-    print(f"  Sensors → Temp: {sensor_data.get('temperature')}°C, "
-          f"Hum: {sensor_data.get('humidity')}%, "
-          f"Gas: {sensor_data.get('air_quality')}, "
-          f"Light: {sensor_data.get('light_level')}")
-    print(f"  Env Status: {env_status}")
+    log.info("  Sensors → Temp: %s°C, Hum: %s%%, Gas: %s, Light: %s\n  Env Status: %s",
+             sensor_data.get('temperature'), sensor_data.get('humidity'),
+             sensor_data.get('air_quality'), sensor_data.get('light_level'), env_status)
+
+    # One timestamp and position lookup shared by every outgoing message
+    now_str = hms()
+    lat, lon = packet.get("latitude"), packet.get("longitude")
 
     # Generate TPMS synthetic data
-    tpms = tpms_gen.generate()
+    with state_lock:
+        tpms = tpms_gen.generate()
     packet["tpms_data"] = tpms
-    packet["relay_timestamp"] = datetime.now().strftime("%H:%M:%S")
+    packet["relay_timestamp"] = now_str
 
     # Add relay to hop trace
     if "hop_trace" in packet:
         if "RELAY" not in packet["hop_trace"]:
             packet["hop_trace"].append("RELAY")
 
-    # Update latest state
-    latest_data["sensor_data"] = sensor_data
-    latest_data["tpms_data"] = tpms
-    latest_data["emergency"] = {
-        "vehicle_id": packet.get("vehicle_id"),
-        "issue": packet.get("issue"),
-        "raw_description": packet.get("raw_description"),
-        "latitude": packet.get("latitude"),
-        "longitude": packet.get("longitude"),
-        "timestamp": packet.get("timestamp"),
-        "hop_trace": packet.get("hop_trace"),
-        "environment_status": env_status,
-    }
+    # Update latest state; a new emergency converts its location once and
+    # forgets earlier helpers
+    update_state(
+        sensor_data=sensor_data,
+        tpms_data=tpms,
+        emergency={
+            "vehicle_id": packet.get("vehicle_id"),
+            "issue": packet.get("issue"),
+            "raw_description": packet.get("raw_description"),
+            "latitude": lat,
+            "longitude": lon,
+            "timestamp": packet.get("timestamp"),
+            "hop_trace": packet.get("hop_trace"),
+            "environment_status": env_status,
+        },
+        emergency_rad=(math.radians(lat or 0), math.radians(lon or 0)),
+        helpers={},
+    )
 
     # Forward to Car2
-    print("\n🚙 Forwarding to Car2...")
-    udp_send(packet, CAR2_IP, CAR2_PORT)
+    log.info("\n🚙 Forwarding to Car2...")
+    outgoing = [(packet, CAR2_IP, CAR2_PORT)]
 
     # Forward to Hospital
-    hospital_msg = {
-        "type": "EMERGENCY_ALERT",
+    hospital_msg = dumps_typed(_HOSPITAL_HEAD, {
         "vehicle_id": packet.get("vehicle_id"),
         "issue": packet.get("issue"),
         "raw_description": packet.get("raw_description"),
-        "latitude": packet.get("latitude"),
-        "longitude": packet.get("longitude"),
+        "latitude": lat,
+        "longitude": lon,
         "timestamp": packet.get("timestamp"),
         "environment_status": env_status,
-        "maps_link": f"https://www.google.com/maps?q={packet.get('latitude')},{packet.get('longitude')}",
-        "relay_timestamp": packet["relay_timestamp"],
-    }
-    print("🏥 Forwarding to Hospital/Ambulance...")
-    udp_send(hospital_msg, HOSPITAL_IP, HOSPITAL_PORT)
-
-    # Push to dashboard queue
-    dashboard_msg = {
-        "type": "EMERGENCY",
+        "maps_link": MAPS_LINK.format(lat, lon),
+        "relay_timestamp": now_str,
+    })
+    log.info("🏥 Forwarding to Hospital/Ambulance...")
+    outgoing.append((hospital_msg, HOSPITAL_IP, HOSPITAL_PORT))
+
+    # Push to dashboard queue, encoded now so the TPMS values are this event's
+    dashboard_msg = dumps_typed(_DASHBOARD_EMERGENCY_HEAD, {
         "data": packet,
         "sensor_data": sensor_data,
         "tpms_data": tpms,
         "environment_status": env_status,
-        "timestamp": datetime.now().strftime("%H:%M:%S"),
-    }
+        "timestamp": now_str,
+    })
     dashboard_queue.put(dashboard_msg)
 
-    # Also send to dashboard via UDP
-    udp_send(dashboard_msg, DASHBOARD_IP, DASHBOARD_PORT)
+    # Car2 + Hospital in one batch; the dashboard flusher sends the queued message
+    udp_send_batch(outgoing)
 
-    print(f"\n✅ Packet distributed to all endpoints")
+    log.info("\n✅ Packet distributed to all endpoints")
 
 
 # ================= HANDLE CAR2 ACK =================
 def handle_car2_ack(data, addr):
     """Process acknowledgment from Car2."""
-    print(f"\n{'='*60}")
-    print(f"🚙 Received ACK from Car2 ({addr[0]}:{addr[1]})")
-    print(f"{'='*60}")
+    global latest_data
+    log.info("\n%s\n🚙 Received ACK from Car2 (%s:%s)\n%s", RULE, addr[0], addr[1], RULE)
 
     try:
-        ack = json.loads(data.decode())
+        ack = loads(data)
     except json.JSONDecodeError:
-        print("  ✗ Invalid JSON from Car2")
+        log.warning("  ✗ Invalid JSON from Car2")
         return
 
     if ack.get("type") != "ACK":
+        log.warning("  ✗ Non-ACK packet on the ACK port from %s:%s", addr[0], addr[1])
         return
 
+    car2_id = ack.get("car2_id", "CAR_02")
     car2_lat = ack.get("car2_latitude", 0)
     car2_lon = ack.get("car2_longitude", 0)
 
-    # Calculate ETA
-    emergency = latest_data.get("emergency")
+    # Record this helper in a new snapshot; the ETA maths below runs on it unlocked
+    with state_lock:
+        snap = latest_data
+        helpers = {**snap["helpers"], car2_id: (car2_lat, car2_lon)}
+        snap = latest_data = {**snap, "helpers": helpers}
+
+    # Calculate ETA for every helper that has acked; the closest one is sent to Car1
+    emergency = snap["emergency"]
     if emergency:
-        acc_lat = emergency.get("latitude", 0)
-        acc_lon = emergency.get("longitude", 0)
-        eta_min = calculate_eta(car2_lat, car2_lon, acc_lat, acc_lon)
-        distance = haversine_distance(car2_lat, car2_lon, acc_lat, acc_lon)
+        acc = (emergency.get("latitude") or 0, emergency.get("longitude") or 0)
+        ids = list(helpers)
+        dists = helper_distances([helpers[h] for h in ids], acc, snap["emergency_rad"])
+        distance = dists[ids.index(car2_id)]
+        nearest = min(range(len(ids)), key=dists.__getitem__)
+        nearest_id, nearest_dist = ids[nearest], dists[nearest]
     else:
-        eta_min = 0
         distance = 0
+        nearest_id, nearest_dist = car2_id, 0
+    eta_min = eta_minutes(distance) if emergency else 0
+    if DEBUG_HAVERSINE_CACHE:
+        log.info("  Distance cache: %s", _haversine_cached.cache_info())
+    nearest_eta = eta_minutes(nearest_dist) if emergency else 0
 
-    print(f"  Car2 Location: ({car2_lat}, {car2_lon})")
-    print(f"  Distance: {distance:.2f} km")
-    print(f"  ETA: {eta_min} minutes")
+    log.info("  Car2 Location: (%s, %s)\n  Distance: %.2f km\n  ETA: %s minutes",
+             car2_lat, car2_lon, distance, eta_min)
 
-    latest_data["car2_ack"] = ack
-    latest_data["car2_eta"] = eta_min
+    update_state(car2_ack=ack, car2_eta=eta_min)
 
     # Notify Dashboard
+    now_str = hms()
     dashboard_ack = {
         "type": "CAR2_ACK",
-        "car2_id": ack.get("car2_id", "CAR_02"),
+        "car2_id": car2_id,
         "car2_latitude": car2_lat,
         "car2_longitude": car2_lon,
         "eta_minutes": eta_min,
         "distance_km": round(distance, 2),
-        "ack_timestamp": datetime.now().strftime("%H:%M:%S"),
+        "ack_timestamp": now_str,
     }
     dashboard_queue.put(dashboard_ack)
-    udp_send(dashboard_ack, DASHBOARD_IP, DASHBOARD_PORT)
 
     # Notify Car1 that help is coming
     car1_status = {
         "type": "HELP_COMING",
-        "helper_id": ack.get("car2_id", "CAR_02"),
-        "eta_minutes": eta_min,
-        "distance_km": round(distance, 2),
-        "timestamp": datetime.now().strftime("%H:%M:%S"),
+        "helper_id": nearest_id,
+        "eta_minutes": nearest_eta,
+        "distance_km": round(nearest_dist, 2),
+        "timestamp": now_str,
     }
-    print("🚗 Notifying Car1 that help is on the way...")
+    log.info("🚗 Notifying Car1 that help is on the way...")
     udp_send(car1_status, CAR1_IP, CAR1_STATUS_PORT)
 
-    print(f"\n✅ ACK processed — ETA {eta_min} min sent to Dashboard + Car1")
+    log.info("\n✅ ACK processed — ETA %s min sent to Dashboard + Car1", eta_min)
 
 
 # ================= TPMS PERIODIC BROADCAST =================
@@ -272,19 +596,111 @@ def tpms_broadcast_loop():
     """Periodically send TPMS data to dashboard."""
     while True:
         time.sleep(3)
-        tpms = tpms_gen.generate()
-        latest_data["tpms_data"] = tpms
+        with state_lock:
+            tpms = tpms_gen.generate()
+        update_state(tpms_data=tpms)
 
-        msg = {
-            "type": "TPMS_UPDATE",
-            "tpms_data": tpms,
-            "timestamp": datetime.now().strftime("%H:%M:%S"),
-        }
-        dashboard_queue.put(msg)
-        udp_send(msg, DASHBOARD_IP, DASHBOARD_PORT)
+        dashboard_queue.put(dumps_typed(_TPMS_UPDATE_HEAD, {"tpms_data": tpms, "timestamp": hms()}))
+
+
+# ================= DASHBOARD FLUSHER =================
+_BATCH_HEAD = b'{"type":"BATCH","items":['
+_BATCH_TAIL = b']}'
+
+
+def pack_batches(payloads, limit=SAFE_UDP_PAYLOAD):
+    """Group encoded messages into datagrams of at most limit bytes.
+
+    Several messages become one BATCH frame built straight from their encoded
+    bytes; a message that alone exceeds the limit still goes out by itself.
+    """
+    overhead = len(_BATCH_HEAD) + len(_BATCH_TAIL)
+    group, size = [], overhead
+    for payload in payloads:
+        if group and size + 1 + len(payload) > limit:
+            yield _frame(group)
+            group, size = [], overhead
+        group.append(payload)
+        size += len(payload) + (1 if len(group) > 1 else 0)
+    if group:
+        yield _frame(group)
+
+
+def _frame(group):
+    if len(group) == 1:
+        return group[0]
+    return _BATCH_HEAD + b",".join(group) + _BATCH_TAIL
+
+
+def dashboard_flush_loop():
+    """Send queued dashboard messages, coalescing bursts into one BATCH datagram."""
+    while True:
+        batch = [dashboard_queue.get()]
+        deadline = time.monotonic() + DASHBOARD_BATCH_WINDOW
+        while len(batch) < DASHBOARD_BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(dashboard_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        try:
+            payloads = [msg if isinstance(msg, bytes) else dumps(msg) for msg in batch]
+        except Exception as e:
+            log.warning("  ✗ Failed to encode dashboard batch: %s", e)
+            continue
+        # Split so each datagram stays within one frame where possible
+        for datagram in pack_batches(payloads):
+            udp_send_bytes(datagram, DASHBOARD_IP, DASHBOARD_PORT)
 
 
 # ================= MAIN LISTENER =================
+def listener_count():
+    """Listener threads to run: one per core (up to 4) where SO_REUSEPORT spreads load."""
+    if not hasattr(socket, "SO_REUSEPORT"):
+        return 1
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def receive_loop(sock, handler):
+    """Queue every datagram on sock for handler, dropping it if the sender's queue is full."""
+    global dropped_packets
+    buf = bytearray(4096)
+    view = memoryview(buf)
+    while True:
+        nbytes, addr = sock.recvfrom_into(buf)
+        # One right-sized copy at the handoff; buf is reused for the next datagram
+        data = bytes(view[:nbytes])
+        try:
+            _work_qs[hash(addr[0]) % HANDLER_THREADS].put_nowait((data, addr, handler))
+        except queue.Full:
+            dropped_packets += 1
+            log.warning("  ✗ Work queue full, dropped packet from %s (%d dropped)",
+                        addr, dropped_packets)
+
+
+def listener_worker(port):
+    """Receive on a SO_REUSEPORT socket of its own; handler threads do the rest."""
+    sock = tune_socket(socket.socket(socket.AF_INET, socket.SOCK_DGRAM), share_port=True)
+    sock.bind(("0.0.0.0", port))
+    # ACKs have their own port, so everything here comes from the ESP32 RSU
+    receive_loop(sock, handle_esp32_packet)
+
+
+def _dispatch(data, addr, handler):
+    try:
+        handler(data, addr)
+    except Exception:
+        log.exception("  ✗ Handler failed for packet from %s", addr)
+
+
+def handler_loop(work_q):
+    """Handle packets from one work queue, one at a time in arrival order."""
+    while True:
+        _dispatch(*work_q.get())
+
+
 def main():
     print("=" * 60)
     print("  📡 SMART RSU RELAY SERVER")
@@ -297,39 +713,36 @@ def main():
     print("=" * 60)
     print("Waiting for packets from ESP32 RSU...\n")
 
+    _log_listener.start()
+
     # Start TPMS broadcast thread
     tpms_thread = threading.Thread(target=tpms_broadcast_loop, daemon=True)
     tpms_thread.start()
 
-    # Main UDP listener
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind(("0.0.0.0", LISTEN_PORT))
+    # Dashboard updates go out through the batching flusher
+    flush_thread = threading.Thread(target=dashboard_flush_loop, daemon=True)
+    flush_thread.start()
 
     # Secondary listener for Car2 ACK on a different port
-    ack_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    ack_sock = tune_socket(socket.socket(socket.AF_INET, socket.SOCK_DGRAM))
     ack_sock.bind(("0.0.0.0", LISTEN_PORT + 10))  # Port 5015 for ACKs
 
     print(f"  ACK listener on port {LISTEN_PORT + 10}")
 
-    def ack_listener():
-        while True:
-            data, addr = ack_sock.recvfrom(4096)
-            handle_car2_ack(data, addr)
+    # Handler threads do the work; every listener below only receives
+    for work_q in _work_qs:
+        threading.Thread(target=handler_loop, args=(work_q,), daemon=True).start()
 
-    ack_thread = threading.Thread(target=ack_listener, daemon=True)
+    ack_thread = threading.Thread(target=receive_loop, args=(ack_sock, handle_car2_ack),
+                                  daemon=True)
     ack_thread.start()
 
-    while True:
-        data, addr = sock.recvfrom(4096)
-        # Check if it's an ACK or an ESP32 packet
-        try:
-            pkt = json.loads(data.decode())
-            if pkt.get("type") == "ACK":
-                handle_car2_ack(data, addr)
-            else:
-                handle_esp32_packet(data, addr)
-        except json.JSONDecodeError:
-            print(f"  ✗ Invalid packet from {addr}")
+    # Main UDP listeners: the kernel hashes incoming datagrams across their sockets
+    workers = listener_count()
+    print(f"  {workers} listener thread(s) on port {LISTEN_PORT}")
+    for _ in range(workers - 1):
+        threading.Thread(target=listener_worker, args=(LISTEN_PORT,), daemon=True).start()
+    listener_worker(LISTEN_PORT)
 
 
 if __name__ == "__main__":
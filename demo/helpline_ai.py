@@ -1,10 +1,18 @@
 import os
+import threading
+from collections import OrderedDict
 from groq import Groq
 
 # Set your API key
 # export GROQ_API_KEY="your_key_here"
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+REQUEST_TIMEOUT_S = 10
+MAX_RETRIES = 1
+
+client = Groq(api_key=os.getenv("GROQ_API_KEY"), timeout=REQUEST_TIMEOUT_S, max_retries=MAX_RETRIES)
+
+# Longest a get_ai_response call can block, retries included
+MAX_REQUEST_S = REQUEST_TIMEOUT_S * (MAX_RETRIES + 1)
 
 SYSTEM_PROMPT = """
 You are an AI Road Emergency Helpline Agent.
@@ -17,7 +25,33 @@ Your job is to:
 Keep responses short, reassuring, and authoritative.
 """
 
+CACHE_SIZE = 256
+
+# Replies keyed on the normalised query, least recently used first
+_response_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
 def get_ai_response(user_query: str) -> str:
+    # Same question (ignoring case and surrounding spaces) -> same answer, no API call.
+    # The model still gets the query as typed.
+    key = user_query.strip().lower()
+    with _cache_lock:
+        if key in _response_cache:
+            _response_cache.move_to_end(key)
+            return _response_cache[key]
+
+    response = _request_response(user_query)
+    if not response:
+        return response
+    with _cache_lock:
+        _response_cache[key] = response
+        if len(_response_cache) > CACHE_SIZE:
+            _response_cache.popitem(last=False)
+    return response
+
+
+def _request_response(user_query: str) -> str:
     completion = client.chat.completions.create(
         model="llama3-8b-8192",
         messages=[
@@ -28,4 +62,5 @@ def get_ai_response(user_query: str) -> str:
         max_tokens=200
     )
 
-    return completion.choices[0].message.content
+    # content can be None (e.g. a refusal or tool call); callers expect a str
+    return completion.choices[0].message.content or ""
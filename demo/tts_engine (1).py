@@ -1,9 +1,25 @@
 import pyttsx3
 
-engine = pyttsx3.init()
-engine.setProperty("rate", 165)
-engine.setProperty("volume", 1.0)
+_engine = None
+
+
+def _get_engine():
+    # Created on first use so it belongs to the thread that speaks, then kept for reuse
+    global _engine
+    if _engine is None:
+        _engine = pyttsx3.init()
+        _engine.setProperty("rate", 165)
+        _engine.setProperty("volume", 1.0)
+    return _engine
 
 def text_to_speech(text: str):
+    """Speaks text through the system voice; blocks until it finishes."""
+    engine = _get_engine()
     engine.say(text)
     engine.runAndWait()
+
+
+def stop_speech():
+    """Interrupts the utterance in progress, if the engine has been created."""
+    if _engine is not None:
+        _engine.stop()
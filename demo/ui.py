@@ -1,14 +1,72 @@
 import sys
+import queue
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout,
     QTextEdit, QPushButton, QLabel
 )
-from PyQt6.QtCore import Qt
-import pygame
-import time
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+
+from helpline_ai import get_ai_response, MAX_REQUEST_S
+from tts_engine import text_to_speech, stop_speech
+
+
+class ResponseThread(QThread):
+    """Fetches the helpline reply off the UI thread."""
+    response_ready = pyqtSignal(str)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, user_text):
+        super().__init__()
+        self.user_text = user_text
+
+    def run(self):
+        try:
+            reply = get_ai_response(self.user_text)
+            if reply:
+                self.response_ready.emit(reply)
+            else:
+                self.error_occurred.emit("The helpline returned an empty reply.")
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+
+
+class SpeechThread(QThread):
+    """Long-lived TTS worker; the speech engine stays on this one thread."""
+    spoken = pyqtSignal()
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.texts = queue.Queue()
+
+    def speak(self, text):
+        self.texts.put(text)
+
+    def shutdown(self, timeout_ms=2000):
+        # Drop replies not yet spoken and cut the current one short
+        while True:
+            try:
+                self.texts.get_nowait()
+            except queue.Empty:
+                break
+        self.texts.put(None)
+        try:
+            stop_speech()
+        except Exception:
+            pass
+        self.wait(timeout_ms)
+
+    def run(self):
+        while True:
+            text = self.texts.get()
+            if text is None:
+                return
+            try:
+                text_to_speech(text)
+            except Exception as e:
+                self.error_occurred.emit(str(e))
+            self.spoken.emit()
 
-from helpline_ai import get_ai_response
-from tts_engine import text_to_speech
 
 class HelplineUI(QWidget):
     def __init__(self):
@@ -40,30 +98,44 @@ class HelplineUI(QWidget):
 
         self.setLayout(layout)
 
+        self.response_thread = None
+        # pyttsx3 plays the audio itself, so no WAV file or mixer is involved
+        self.speech_thread = SpeechThread()
+        self.speech_thread.spoken.connect(lambda: self.send_btn.setEnabled(True))
+        self.speech_thread.error_occurred.connect(self.on_error)
+        self.speech_thread.start()
+
     def process_query(self):
         user_text = self.input_box.toPlainText().strip()
         if not user_text:
             return
 
         self.response_box.setText("Processing emergency request...")
-        QApplication.processEvents()
+        self.send_btn.setEnabled(False)
 
-        ai_response = get_ai_response(user_text)
-        self.response_box.setText(ai_response)
-
-        # Generate voice
-        text_to_speech(ai_response)
+        self.response_thread = ResponseThread(user_text)
+        self.response_thread.response_ready.connect(self.on_response)
+        self.response_thread.error_occurred.connect(self.on_error)
+        self.response_thread.start()
 
-        # Play audio
-        self.play_audio()
-
-    def play_audio(self):
-        pygame.mixer.init()
-        pygame.mixer.music.load("tts.wav")
-        pygame.mixer.music.play()
+    def on_response(self, ai_response):
+        self.response_box.setText(ai_response)
 
-        while pygame.mixer.music.get_busy():
-            time.sleep(0.1)
+        self.speech_thread.speak(ai_response)
+
+    def on_error(self, message):
+        self.response_box.append(f"\n⚠ {message}")
+        self.send_btn.setEnabled(True)
+
+    def closeEvent(self, event):
+        self.hide()
+        if self.response_thread is not None:
+            # A reply still on its way must not land in the closing window
+            self.response_thread.response_ready.disconnect()
+            self.response_thread.error_occurred.disconnect()
+            self.response_thread.wait((MAX_REQUEST_S + 1) * 1000)
+        self.speech_thread.shutdown()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)